@@ -3,8 +3,10 @@ import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
 import * as iam from "aws-cdk-lib/aws-iam";
 import * as kms from "aws-cdk-lib/aws-kms";
 import * as lambda from "aws-cdk-lib/aws-lambda";
+import * as lambdaEventSources from "aws-cdk-lib/aws-lambda-event-sources";
 import * as s3 from "aws-cdk-lib/aws-s3";
 import * as secretsmanager from "aws-cdk-lib/aws-secretsmanager";
+import * as sqs from "aws-cdk-lib/aws-sqs";
 import * as sfn from "aws-cdk-lib/aws-stepfunctions";
 import { Construct } from "constructs";
 import * as path from "path";
@@ -30,7 +32,7 @@ export interface GoogleMeetLambdaStackProps extends cdk.StackProps {
  * - Calendar Sync Lambda: カレンダーイベント同期
  * - Meet Config Lambda: Meet Space 設定
  * - Event Handler Lambda: Pub/Sub Webhook 処理
- * - Download Recording Lambda: 録画ダウンロード
+ * - Download Recording Lambda: 録画ダウンロード（SQS キュー経由でバッチ起動）
  */
 export class GoogleMeetLambdaStack extends cdk.Stack {
   public readonly googleAuthLambda: lambda.Function;
@@ -38,6 +40,7 @@ export class GoogleMeetLambdaStack extends cdk.Stack {
   public readonly meetConfigLambda: lambda.Function;
   public readonly eventHandlerLambda: lambda.Function;
   public readonly downloadRecordingLambda: lambda.Function;
+  public readonly downloadRecordingQueue: sqs.Queue;
 
   constructor(scope: Construct, id: string, props: GoogleMeetLambdaStackProps) {
     super(scope, id, props);
@@ -168,6 +171,28 @@ export class GoogleMeetLambdaStack extends cdk.Stack {
       },
     });
 
+    // ========================================
+    // Download Recording Queue
+    // ========================================
+    // Event Handler -> SQS -> Download Recording Lambda
+    // 録画ダウンロード要求をバッチでまとめて処理する
+    const downloadRecordingDlq = new sqs.Queue(this, "DownloadRecordingDlq", {
+      queueName: `ek-transcript-download-recording-dlq-${environment}`,
+      retentionPeriod: cdk.Duration.days(14),
+    });
+
+    this.downloadRecordingQueue = new sqs.Queue(this, "DownloadRecordingQueue", {
+      queueName: `ek-transcript-download-recording-${environment}`,
+      // Lambda タイムアウト (15分) の 6 倍
+      visibilityTimeout: cdk.Duration.minutes(90),
+      // 録画準備中のメッセージは Lambda 側で可視性タイムアウトを 2 分から倍々（上限 60 分）に
+      // 短縮して再配信する。15 回で約 10 時間待ってから DLQ に送る
+      deadLetterQueue: {
+        queue: downloadRecordingDlq,
+        maxReceiveCount: 15,
+      },
+    });
+
     // ========================================
     // Event Handler Lambda
     // ========================================
@@ -184,7 +209,7 @@ export class GoogleMeetLambdaStack extends cdk.Stack {
       timeout: cdk.Duration.seconds(30),
       environment: {
         ...commonEnv,
-        DOWNLOAD_LAMBDA_NAME: `ek-transcript-download-recording-${environment}`,
+        DOWNLOAD_QUEUE_URL: this.downloadRecordingQueue.queueUrl,
       },
     });
 
@@ -209,6 +234,7 @@ export class GoogleMeetLambdaStack extends cdk.Stack {
         environment: {
           ...commonEnv,
           RECORDINGS_BUCKET: recordingsBucket.bucketName,
+          DOWNLOAD_QUEUE_URL: this.downloadRecordingQueue.queueUrl,
         },
       }
     );
@@ -253,8 +279,17 @@ export class GoogleMeetLambdaStack extends cdk.Stack {
     // S3 permissions for Calendar Sync Lambda (for analyzeRecording)
     recordingsBucket.grantReadWrite(this.calendarSyncLambda);
 
-    // Event Handler can invoke Download Recording Lambda
-    this.downloadRecordingLambda.grantInvoke(this.eventHandlerLambda);
+    // Event Handler enqueues download requests
+    this.downloadRecordingQueue.grantSendMessages(this.eventHandlerLambda);
+
+    // Download Recording Lambda consumes the queue in batches
+    this.downloadRecordingLambda.addEventSource(
+      new lambdaEventSources.SqsEventSource(this.downloadRecordingQueue, {
+        batchSize: 10,
+        maxBatchingWindow: cdk.Duration.seconds(10),
+        reportBatchItemFailures: true,
+      })
+    );
 
     // Calendar Sync Lambda permissions for Step Functions and interviews table
     if (stateMachine) {
@@ -299,6 +334,11 @@ export class GoogleMeetLambdaStack extends cdk.Stack {
       exportName: `${id}-DownloadRecordingLambdaArn`,
     });
 
+    new cdk.CfnOutput(this, "DownloadRecordingQueueUrl", {
+      value: this.downloadRecordingQueue.queueUrl,
+      exportName: `${id}-DownloadRecordingQueueUrl`,
+    });
+
     new cdk.CfnOutput(this, "SharedLayerArn", {
       value: sharedLayer.layerVersionArn,
       exportName: `${id}-SharedLayerArn`,
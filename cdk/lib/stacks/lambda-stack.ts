@@ -195,6 +195,10 @@ export class LambdaStack extends cdk.Stack {
         }
       ),
       memorySize: 6144, // For faster-whisper medium model
+      // 1 回の呼び出しで SplitBySpeaker が区切ったバッチ（合計 5 分以内、
+      // TRANSCRIBE_BATCH_MAX_SECONDS）を処理する。6GB（約 3.5 vCPU）での medium / int8 の
+      // CPU 推論はおおむね実時間程度の速度のため、バッチ合計の音声が約 12 分までなら
+      // Lambda 上限の 15 分に収まる（5 分を超える単独セグメントはそのまま 1 バッチになる）
       timeout: cdk.Duration.minutes(15),
       environment: {
         INPUT_BUCKET: inputBucket.bucketName,
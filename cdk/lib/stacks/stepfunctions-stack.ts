@@ -173,7 +173,7 @@ export class StepFunctionsStack extends cdk.Stack {
       resultPath: "$.error",
     });
 
-    // Transcribe Task (single segment)
+    // Transcribe Task (batch of segments)
     const transcribeTask = new tasks.LambdaInvoke(this, "Transcribe", {
       lambdaFunction: transcribeFn,
       outputPath: "$.Payload",
@@ -187,14 +187,16 @@ export class StepFunctionsStack extends cdk.Stack {
     });
 
     // Map state for parallel transcription
+    // SplitBySpeaker が合計音声長で区切ったバッチごとに1回 Lambda を呼び出し、
+    // モデル読み込みを共有して複数セグメントを文字起こしする
     // States.DataLimitExceeded対策: 結果は各Lambdaが個別にS3に保存するため、
     // Map stateの結果は破棄する（256KB制限を回避）
     const transcribeSegments = new sfn.Map(this, "TranscribeSegments", {
-      itemsPath: "$.segment_files",
+      itemsPath: "$.segment_batches",
       maxConcurrency: 10,
       parameters: {
         "bucket.$": "$.bucket",
-        "segment_file.$": "$$.Map.Item.Value",
+        "segment_files.$": "$$.Map.Item.Value",
       },
       resultPath: sfn.JsonPath.DISCARD,
     });
@@ -218,6 +218,48 @@ describe("GoogleMeetLambdaStack", () => {
     });
   });
 
+  describe("Download Recording Queue", () => {
+    test("creates download recording queue with DLQ", () => {
+      template.hasResourceProperties("AWS::SQS::Queue", {
+        QueueName: "ek-transcript-download-recording-test",
+        VisibilityTimeout: 5400,
+        RedrivePolicy: Match.objectLike({
+          maxReceiveCount: 15,
+        }),
+      });
+    });
+
+    test("Download Recording Lambda consumes the queue in batches", () => {
+      template.hasResourceProperties("AWS::Lambda::EventSourceMapping", {
+        BatchSize: 10,
+        MaximumBatchingWindowInSeconds: 10,
+        FunctionResponseTypes: ["ReportBatchItemFailures"],
+      });
+    });
+
+    test("Download Recording Lambda has DOWNLOAD_QUEUE_URL for deferring messages", () => {
+      template.hasResourceProperties("AWS::Lambda::Function", {
+        FunctionName: Match.stringLikeRegexp("download-recording"),
+        Environment: {
+          Variables: Match.objectLike({
+            DOWNLOAD_QUEUE_URL: Match.anyValue(),
+          }),
+        },
+      });
+    });
+
+    test("Event Handler Lambda has DOWNLOAD_QUEUE_URL environment variable", () => {
+      template.hasResourceProperties("AWS::Lambda::Function", {
+        FunctionName: Match.stringLikeRegexp("event-handler"),
+        Environment: {
+          Variables: Match.objectLike({
+            DOWNLOAD_QUEUE_URL: Match.anyValue(),
+          }),
+        },
+      });
+    });
+  });
+
   describe("IAM Roles", () => {
     test("creates IAM roles for Lambda functions", () => {
       const resources = template.findResources("AWS::IAM::Role");
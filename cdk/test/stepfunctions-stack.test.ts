@@ -0,0 +1,75 @@
+import * as cdk from "aws-cdk-lib";
+import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
+import * as lambda from "aws-cdk-lib/aws-lambda";
+import * as s3 from "aws-cdk-lib/aws-s3";
+import { Template } from "aws-cdk-lib/assertions";
+import { StepFunctionsStack } from "../lib/stacks/stepfunctions-stack";
+
+describe("StepFunctionsStack", () => {
+  let states: Record<string, any>;
+
+  beforeAll(() => {
+    const app = new cdk.App();
+
+    // Create a prerequisite stack to hold mock resources
+    const prereqStack = new cdk.Stack(app, "PrereqStack", {
+      env: { account: "123456789012", region: "ap-northeast-1" },
+    });
+
+    const mockFn = (id: string): lambda.IFunction =>
+      new lambda.Function(prereqStack, id, {
+        runtime: lambda.Runtime.PYTHON_3_12,
+        handler: "index.handler",
+        code: lambda.Code.fromInline("def handler(event, context): pass"),
+      });
+
+    const stack = new StepFunctionsStack(app, "TestStepFunctionsStack", {
+      environment: "test",
+      inputBucket: new s3.Bucket(prereqStack, "MockInputBucket"),
+      outputBucket: new s3.Bucket(prereqStack, "MockOutputBucket"),
+      interviewsTable: new dynamodb.Table(prereqStack, "MockInterviewsTable", {
+        partitionKey: { name: "interview_id", type: dynamodb.AttributeType.STRING },
+      }),
+      extractAudioFn: mockFn("MockExtractAudioFn"),
+      chunkAudioFn: mockFn("MockChunkAudioFn"),
+      diarizeFn: mockFn("MockDiarizeFn"),
+      mergeSpeakersFn: mockFn("MockMergeSpeakersFn"),
+      splitBySpeakerFn: mockFn("MockSplitBySpeakerFn"),
+      transcribeFn: mockFn("MockTranscribeFn"),
+      aggregateResultsFn: mockFn("MockAggregateResultsFn"),
+      llmAnalysisFn: mockFn("MockLlmAnalysisFn"),
+      env: { account: "123456789012", region: "ap-northeast-1" },
+    });
+
+    // DefinitionString は Fn::Join なので、トークン部分（関数 ARN など）を仮の文字列に置き換えてパースする
+    const template = Template.fromStack(stack);
+    const [stateMachine] = Object.values(
+      template.findResources("AWS::StepFunctions::StateMachine")
+    );
+    const parts: unknown[] = stateMachine.Properties.DefinitionString["Fn::Join"][1];
+    const definition = JSON.parse(
+      parts.map((part) => (typeof part === "string" ? part : "TOKEN")).join("")
+    );
+    states = definition.States;
+  });
+
+  describe("Transcribe batching", () => {
+    test("SplitBySpeaker is followed directly by TranscribeSegments", () => {
+      expect(states.SplitBySpeaker.Next).toBe("TranscribeSegments");
+      expect(states.BatchSegmentFiles).toBeUndefined();
+    });
+
+    test("TranscribeSegments maps over segment_batches and passes each as segment_files", () => {
+      expect(states.TranscribeSegments).toMatchObject({
+        Type: "Map",
+        ItemsPath: "$.segment_batches",
+        MaxConcurrency: 10,
+        Parameters: {
+          "bucket.$": "$.bucket",
+          "segment_files.$": "$$.Map.Item.Value",
+        },
+        ResultPath: null,
+      });
+    });
+  });
+});
@@ -9,6 +9,7 @@ Version: 4.0 - States.DataLimitExceeded対策（完全版）
 - Map stateの結果は使用しない（256KB制限対策）
 """
 
+import gzip
 import json
 import logging
 import os
@@ -75,7 +76,11 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
         try:
             response = s3.get_object(Bucket=bucket, Key=result_key)
-            result_data = json.loads(response["Body"].read().decode("utf-8"))
+            body = response["Body"].read()
+            # transcribe は長い結果のみ gzip 圧縮して保存する
+            if response.get("ContentEncoding") == "gzip":
+                body = gzip.decompress(body)
+            result_data = json.loads(body.decode("utf-8"))
             full_results.append(result_data)
 
             if i % 100 == 0:
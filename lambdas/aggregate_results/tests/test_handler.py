@@ -8,6 +8,7 @@ AggregateResults Lambda のテスト
 - 各セグメントに対応するtranscribe_resultsをS3から読み込み
 """
 
+import gzip
 import importlib.util
 import io
 import json
@@ -114,6 +115,32 @@ class TestAggregateResults:
         assert body[0]["text"] == "1番目"
         assert body[1]["text"] == "2番目"
 
+    def test_lambda_handler_gzipped_result(self, mock_s3: MagicMock) -> None:
+        """gzip 圧縮された文字起こし結果を展開して読み込めること"""
+        segment_files = [
+            {"key": "segments/test_0000_SPEAKER_00.wav", "speaker": "SPEAKER_00", "start": 0.0, "end": 5.0},
+        ]
+        result1 = {"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "長い発言"}
+
+        mock_s3.get_object.side_effect = [
+            self._make_s3_response(segment_files),
+            {
+                "Body": io.BytesIO(gzip.compress(json.dumps(result1).encode("utf-8"))),
+                "ContentEncoding": "gzip",
+            },
+        ]
+
+        event = {
+            "bucket": "test-bucket",
+            "segment_files_key": "metadata/test_segment_files.json",
+            "audio_key": "processed/test.wav",
+        }
+
+        lambda_module.lambda_handler(event, MagicMock())
+
+        body = json.loads(mock_s3.put_object.call_args.kwargs["Body"])
+        assert body[0]["text"] == "長い発言"
+
     def test_lambda_handler_many_segments(self, mock_s3: MagicMock) -> None:
         """多数のセグメント（800+）を処理できること"""
         num_segments = 800
@@ -0,0 +1,41 @@
+"""
+Lambda テスト共通フィクスチャ
+
+各 Lambda の lambda_function.py を読み込む lambda_module フィクスチャを提供する。
+Lambda ごとのパス設定やモックは、それぞれの tests/conftest.py で行う。
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def lambda_module(request: pytest.FixtureRequest) -> ModuleType:
+    """
+    テスト対象 Lambda の lambda_function.py を動的にインポート（Lambda ごとに1回）
+
+    どの Lambda も lambda_function という同名モジュールのため、
+    <Lambda ディレクトリ名>_lambda という名前で sys.modules に登録し、
+    同じ Lambda の2つ目以降のテストファイルでは登録済みのモジュールを返す。
+    """
+    path = request.path
+    lambda_dir = next(p for p in (path, *path.parents) if (p / "lambda_function.py").exists())
+    module_name = f"{lambda_dir.name}_lambda"
+
+    cached = sys.modules.get(module_name)
+    if cached is not None:
+        return cached
+
+    # Lambda ディレクトリをパスに追加（progress などの同梱モジュールを見つけるため）
+    if str(lambda_dir) not in sys.path:
+        sys.path.insert(0, str(lambda_dir))
+
+    spec = importlib.util.spec_from_file_location(module_name, lambda_dir / "lambda_function.py")
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
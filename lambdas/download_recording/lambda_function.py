@@ -12,6 +12,7 @@ import logging
 import os
 import sys
 from io import BytesIO
+from typing import Any
 
 import boto3
 from googleapiclient.discovery import build
@@ -28,10 +29,20 @@ logger.setLevel(logging.INFO)
 # AWS クライアント
 dynamodb = boto3.resource("dynamodb")
 s3_client = boto3.client("s3")
+sqs_client = boto3.client("sqs")
 
 # 環境変数
 MEETINGS_TABLE = os.environ.get("MEETINGS_TABLE", "")
 RECORDINGS_BUCKET = os.environ.get("RECORDINGS_BUCKET", "")
+DOWNLOAD_QUEUE_URL = os.environ.get("DOWNLOAD_QUEUE_URL", "")
+
+# SQS バッチ処理で次のメッセージに着手するのに必要な残り実行時間（ミリ秒）
+MIN_REMAINING_TIME_MS = 300_000
+
+# 録画準備中のメッセージを再配信するまでの待ち時間（秒）
+# 受信回数ごとに倍にし、上限で頭打ちにする（キューの可視性タイムアウト 90 分は待たない）
+NOT_READY_BASE_DELAY_SEC = 120
+NOT_READY_MAX_DELAY_SEC = 3600
 
 
 def get_recording_info(user_id: str, recording_name: str) -> dict:
@@ -318,17 +329,17 @@ def download_transcript(user_id: str, meeting_id: str, transcript_name: str) ->
     }
 
 
-def lambda_handler(event: dict, context) -> dict:
+def process_request(request: dict) -> dict:
     """
-    Lambda ハンドラー
+    単一のダウンロード要求を処理
 
     サポートするアクション:
     - download_recording: 録画ファイルをダウンロード
     - download_transcript: 文字起こしファイルをダウンロード
     """
-    action = event.get("action")
-    user_id = event.get("user_id")
-    meeting_id = event.get("meeting_id")
+    action = request.get("action")
+    user_id = request.get("user_id")
+    meeting_id = request.get("meeting_id")
 
     logger.info(f"Processing action: {action} for meeting: {meeting_id}")
 
@@ -344,14 +355,14 @@ def lambda_handler(event: dict, context) -> dict:
 
     try:
         if action == "download_recording":
-            recording_name = event.get("recording_name")
+            recording_name = request.get("recording_name")
             if not recording_name:
                 return {"success": False, "error": "Missing recording_name parameter"}
 
             return download_recording(user_id, meeting_id, recording_name)
 
         elif action == "download_transcript":
-            transcript_name = event.get("transcript_name")
+            transcript_name = request.get("transcript_name")
             if not transcript_name:
                 return {"success": False, "error": "Missing transcript_name parameter"}
 
@@ -370,3 +381,88 @@ def lambda_handler(event: dict, context) -> dict:
             pass
 
         return {"success": False, "error": str(e)}
+
+
+def defer_message(record: dict, delay_seconds: int) -> None:
+    """
+    SQS メッセージの可視性タイムアウトを短くし、delay_seconds 後に再配信させる
+
+    失敗してもキューの可視性タイムアウト後に再配信されるため、警告のみ出す。
+
+    Args:
+        record: SQS レコード
+        delay_seconds: 再配信までの秒数
+    """
+    try:
+        sqs_client.change_message_visibility(
+            QueueUrl=DOWNLOAD_QUEUE_URL,
+            ReceiptHandle=record["receiptHandle"],
+            VisibilityTimeout=delay_seconds,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to change visibility of {record['messageId']}: {e}")
+
+
+def not_ready_delay(record: dict) -> int:
+    """録画準備中のメッセージの再配信待ち時間（秒）を受信回数から求める"""
+    receive_count = int(record.get("attributes", {}).get("ApproximateReceiveCount", 1))
+    return int(min(NOT_READY_BASE_DELAY_SEC * 2 ** (receive_count - 1), NOT_READY_MAX_DELAY_SEC))
+
+
+def process_sqs_batch(records: list[dict], context: Any) -> dict:
+    """
+    SQS イベントソースから受け取ったバッチを処理
+
+    再試行で解決するメッセージ（録画準備中・残り実行時間不足で未処理）は
+    可視性タイムアウトを短くしたうえで batchItemFailures として返し、SQS から再配信させる。
+    エラー（FAILED 更新済み）や不正なメッセージは再試行しない。
+
+    Args:
+        records: SQS レコードのリスト
+        context: Lambda コンテキスト
+
+    Returns:
+        {"batchItemFailures": [{"itemIdentifier": messageId}, ...]}
+    """
+    deferred: list[dict[str, str]] = []
+
+    for index, record in enumerate(records):
+        if (
+            context is not None
+            and context.get_remaining_time_in_millis() < MIN_REMAINING_TIME_MS
+        ):
+            logger.warning(f"Low remaining time, deferring {len(records) - index} messages")
+            for pending in records[index:]:
+                # 未処理なので待たずに再配信させる
+                defer_message(pending, 0)
+                deferred.append({"itemIdentifier": pending["messageId"]})
+            break
+
+        message_id = record["messageId"]
+        try:
+            request = json.loads(record["body"])
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid message body {message_id}: {e}")
+            continue
+
+        result = process_request(request)
+
+        if not result.get("success") and "error" not in result:
+            # 録画準備中など、再試行で解決するケース
+            defer_message(record, not_ready_delay(record))
+            deferred.append({"itemIdentifier": message_id})
+
+    return {"batchItemFailures": deferred}
+
+
+def lambda_handler(event: dict, context: Any) -> dict:
+    """
+    Lambda ハンドラー
+
+    SQS イベント（Records）の場合はバッチ処理し、
+    それ以外は単一のダウンロード要求として処理する。
+    """
+    if "Records" in event:
+        return process_sqs_batch(event["Records"], context)
+
+    return process_request(event)
@@ -414,3 +414,97 @@ class TestErrorHandling:
         update_call = mock_table.update_item.call_args
         if update_call:
             assert "FAILED" in str(update_call)
+
+
+class TestSqsBatch:
+    """SQS イベントソース経由のバッチ処理テスト"""
+
+    @pytest.fixture(autouse=True)
+    def mock_sqs(self):
+        """SQS クライアントのモック"""
+        with patch("lambda_function.sqs_client") as mock:
+            yield mock
+
+    @staticmethod
+    def _record(message_id: str, meeting_id: str, receive_count: int = 1) -> dict:
+        return {
+            "messageId": message_id,
+            "receiptHandle": f"handle-{message_id}",
+            "attributes": {"ApproximateReceiveCount": str(receive_count)},
+            "body": json.dumps(
+                {
+                    "action": "download_recording",
+                    "user_id": "user-123",
+                    "meeting_id": meeting_id,
+                    "recording_name": "conferenceRecords/conf123/recordings/rec456",
+                }
+            ),
+        }
+
+    @patch("lambda_function.process_request")
+    def test_sqs_batch_processes_each_record(self, mock_process):
+        """各レコードを個別に処理し、成功時は batchItemFailures が空"""
+        import lambda_function
+
+        mock_process.return_value = {"success": True}
+        event = {"Records": [self._record("m1", "meeting-1"), self._record("m2", "meeting-2")]}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        assert result == {"batchItemFailures": []}
+        assert [c.args[0]["meeting_id"] for c in mock_process.call_args_list] == [
+            "meeting-1",
+            "meeting-2",
+        ]
+
+    @patch("lambda_function.process_request")
+    def test_sqs_batch_retries_recording_not_ready(self, mock_process, mock_sqs):
+        """録画準備中のメッセージのみ再配信対象にする（エラーは再試行しない）"""
+        import lambda_function
+
+        mock_process.side_effect = [
+            {"success": False, "message": "Recording not ready. Please retry later."},
+            {"success": False, "error": "No drive file found"},
+        ]
+        event = {"Records": [self._record("m1", "meeting-1"), self._record("m2", "meeting-2")]}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        assert result == {"batchItemFailures": [{"itemIdentifier": "m1"}]}
+        # 可視性タイムアウト（90 分）を待たずに短い間隔で再配信させる
+        mock_sqs.change_message_visibility.assert_called_once()
+        kwargs = mock_sqs.change_message_visibility.call_args.kwargs
+        assert kwargs["ReceiptHandle"] == "handle-m1"
+        assert kwargs["VisibilityTimeout"] == lambda_function.NOT_READY_BASE_DELAY_SEC
+
+    def test_not_ready_delay_backs_off_up_to_max(self):
+        """録画準備中の再配信待ち時間は受信回数ごとに倍になり、上限で頭打ちになること"""
+        import lambda_function
+
+        delays = [
+            lambda_function.not_ready_delay(self._record("m1", "meeting-1", receive_count=n))
+            for n in range(1, 8)
+        ]
+
+        assert delays[:3] == [120, 240, 480]
+        assert delays[-1] == lambda_function.NOT_READY_MAX_DELAY_SEC
+
+    @patch("lambda_function.process_request")
+    def test_sqs_batch_defers_when_time_is_low(self, mock_process, mock_sqs):
+        """残り実行時間が少ない場合、未処理メッセージを待たずに再配信に回す"""
+        import lambda_function
+
+        mock_process.return_value = {"success": True}
+        context = MagicMock()
+        context.get_remaining_time_in_millis.side_effect = [900_000, 1_000]
+        event = {"Records": [self._record("m1", "meeting-1"), self._record("m2", "meeting-2")]}
+
+        result = lambda_function.lambda_handler(event, context)
+
+        assert result == {"batchItemFailures": [{"itemIdentifier": "m2"}]}
+        mock_process.assert_called_once()
+        mock_sqs.change_message_visibility.assert_called_once_with(
+            QueueUrl=lambda_function.DOWNLOAD_QUEUE_URL,
+            ReceiptHandle="handle-m2",
+            VisibilityTimeout=0,
+        )
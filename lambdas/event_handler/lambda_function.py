@@ -11,6 +11,7 @@ import base64
 import json
 import logging
 import os
+from collections import OrderedDict
 
 import boto3
 
@@ -20,14 +21,43 @@ logger.setLevel(logging.INFO)
 
 # AWS クライアント
 dynamodb = boto3.resource("dynamodb")
-lambda_client = boto3.client("lambda")
+sqs = boto3.client("sqs")
 
 # 環境変数
 MEETINGS_TABLE = os.environ.get("MEETINGS_TABLE", "")
-DOWNLOAD_LAMBDA_NAME = os.environ.get("DOWNLOAD_LAMBDA_NAME", "")
+DOWNLOAD_QUEUE_URL = os.environ.get("DOWNLOAD_QUEUE_URL", "")
+
+# SQS SendMessageBatch の最大エントリ数
+SQS_MAX_BATCH_SIZE = 10
+
+
+class BoundedMessageCache:
+    """
+    件数上限付きの処理済みメッセージID集合（LRU）
+
+    capacity 件を超えると最も古いIDから破棄する。判定は厳密で偽陽性はない
+    （偽陽性があると新しいイベントを重複として ACK し、録画を取りこぼす）。
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self.capacity = capacity
+        self._ids: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, key: str) -> None:
+        self._ids[key] = None
+        self._ids.move_to_end(key)
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+
 
 # 重複メッセージ検出用（メモリキャッシュ、Lambda実行間はリセット）
-processed_messages: dict = {}
+processed_messages = BoundedMessageCache(capacity=10_000)
 
 
 def parse_pubsub_message(event: dict) -> tuple[dict, str]:
@@ -94,7 +124,34 @@ def mark_message_processed(message_id: str):
     Args:
         message_id: Pub/Sub メッセージID
     """
-    processed_messages[message_id] = True
+    processed_messages.add(message_id)
+
+
+def enqueue_download_requests(requests: list[dict]):
+    """
+    ダウンロード要求を SQS キューに投入
+
+    Download Lambda は SQS イベントソース経由でバッチ起動される。
+
+    Args:
+        requests: Download Lambda に渡すペイロードのリスト
+
+    Raises:
+        RuntimeError: 一部のメッセージ送信に失敗した場合
+    """
+    for offset in range(0, len(requests), SQS_MAX_BATCH_SIZE):
+        batch = requests[offset : offset + SQS_MAX_BATCH_SIZE]
+        response = sqs.send_message_batch(
+            QueueUrl=DOWNLOAD_QUEUE_URL,
+            Entries=[
+                {"Id": str(i), "MessageBody": json.dumps(request)}
+                for i, request in enumerate(batch)
+            ],
+        )
+
+        failed = response.get("Failed", [])
+        if failed:
+            raise RuntimeError(f"Failed to enqueue download requests: {failed}")
 
 
 def extract_conference_record_id(resource_name: str) -> str:
@@ -186,19 +243,17 @@ def handle_recording_file_generated(data: dict):
         },
     )
 
-    # Download Lambda を非同期で起動
-    lambda_client.invoke(
-        FunctionName=DOWNLOAD_LAMBDA_NAME,
-        InvocationType="Event",  # 非同期
-        Payload=json.dumps({
+    # Download Lambda へはキュー経由で渡す（SQS イベントソースでバッチ処理）
+    enqueue_download_requests([
+        {
             "action": "download_recording",
             "user_id": user_id,
             "meeting_id": meeting_id,
             "recording_name": recording_name,
-        }),
-    )
+        }
+    ])
 
-    logger.info(f"Triggered download for meeting: {meeting_id}")
+    logger.info(f"Enqueued download for meeting: {meeting_id}")
 
 
 def handle_conference_started(data: dict):
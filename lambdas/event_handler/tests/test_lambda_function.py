@@ -23,16 +23,16 @@ class TestRecordingFileGenerated:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
-    @patch("lambda_function.processed_messages", {})
-    @patch("lambda_function.lambda_client")
+    @patch("lambda_function.processed_messages", set())
+    @patch("lambda_function.sqs")
     @patch("lambda_function.dynamodb")
     def test_recording_file_generated_triggers_download(
-        self, mock_dynamodb, mock_lambda
+        self, mock_dynamodb, mock_sqs
     ):
-        """録画完了イベントでダウンロード Lambda を起動"""
+        """録画完了イベントでダウンロード要求を SQS に投入"""
         import lambda_function
 
         # DynamoDB モック
@@ -48,10 +48,10 @@ class TestRecordingFileGenerated:
         }
         mock_dynamodb.Table.return_value = mock_table
 
-        # Lambda invoke モック
-        mock_lambda.invoke.return_value = {
-            "StatusCode": 202,
-            "Payload": MagicMock(),
+        # SQS send_message_batch モック
+        mock_sqs.send_message_batch.return_value = {
+            "Successful": [{"Id": "0"}],
+            "Failed": [],
         }
 
         # Pub/Sub メッセージ（Base64エンコード）
@@ -81,16 +81,25 @@ class TestRecordingFileGenerated:
         result = lambda_function.lambda_handler(event, None)
 
         assert result["statusCode"] == 200
-        mock_lambda.invoke.assert_called_once()
+        mock_sqs.send_message_batch.assert_called_once()
+
+        entries = mock_sqs.send_message_batch.call_args.kwargs["Entries"]
+        assert len(entries) == 1
+        assert json.loads(entries[0]["MessageBody"]) == {
+            "action": "download_recording",
+            "user_id": "user-123",
+            "meeting_id": "meeting-123",
+            "recording_name": "conferenceRecords/conf123/recordings/rec456",
+        }
 
     @patch.dict(
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
-    @patch("lambda_function.processed_messages", {})
+    @patch("lambda_function.processed_messages", set())
     @patch("lambda_function.dynamodb")
     def test_recording_file_generated_updates_status(self, mock_dynamodb):
         """録画完了イベントで meeting の status を更新"""
@@ -116,13 +125,46 @@ class TestRecordingFileGenerated:
             })
         }
 
-        with patch("lambda_function.lambda_client"):
+        with patch("lambda_function.sqs"):
             lambda_function.lambda_handler(event, None)
 
         # update_item が呼ばれたことを確認
         mock_table.update_item.assert_called()
 
 
+class TestEnqueueDownloadRequests:
+    """ダウンロード要求の SQS 投入テスト"""
+
+    @patch("lambda_function.sqs")
+    def test_enqueue_splits_into_batches_of_10(self, mock_sqs):
+        """SendMessageBatch の上限 (10件) ごとに分割して送信"""
+        import lambda_function
+
+        mock_sqs.send_message_batch.return_value = {"Successful": [], "Failed": []}
+
+        requests = [{"meeting_id": f"meeting-{i}"} for i in range(23)]
+        lambda_function.enqueue_download_requests(requests)
+
+        batch_sizes = [
+            len(call.kwargs["Entries"])
+            for call in mock_sqs.send_message_batch.call_args_list
+        ]
+        assert batch_sizes == [10, 10, 3]
+
+    @patch("lambda_function.sqs")
+    def test_enqueue_raises_on_failed_entries(self, mock_sqs):
+        """送信失敗したエントリがあれば例外を送出"""
+        import lambda_function
+
+        mock_sqs.send_message_batch.return_value = {
+            "Successful": [],
+            "Failed": [{"Id": "0", "Code": "InternalError"}],
+        }
+
+        with pytest.raises(RuntimeError):
+            lambda_function.enqueue_download_requests([{"meeting_id": "meeting-1"}])
+
+
 class TestConferenceStarted:
     """conference.started イベントのテスト"""
 
@@ -130,10 +172,10 @@ class TestConferenceStarted:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
-    @patch("lambda_function.processed_messages", {})
+    @patch("lambda_function.processed_messages", set())
     @patch("lambda_function.dynamodb")
     def test_conference_started_updates_status(self, mock_dynamodb):
         """会議開始イベントで status を RECORDING に更新"""
@@ -174,10 +216,10 @@ class TestConferenceEnded:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
-    @patch("lambda_function.processed_messages", {})
+    @patch("lambda_function.processed_messages", set())
     @patch("lambda_function.dynamodb")
     def test_conference_ended_updates_status(self, mock_dynamodb):
         """会議終了イベントで status を PROCESSING に更新"""
@@ -215,10 +257,10 @@ class TestDuplicateMessage:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
-    @patch("lambda_function.processed_messages", {"msg-123": True})
+    @patch("lambda_function.processed_messages", {"msg-123"})
     def test_duplicate_message_returns_200(self):
         """重複メッセージは 200 で返す（Pub/Sub に ACK）"""
         import lambda_function
@@ -238,6 +280,59 @@ class TestDuplicateMessage:
         assert result["statusCode"] == 200
 
 
+class TestBoundedMessageCache:
+    """重複検出キャッシュのテスト"""
+
+    def test_added_ids_are_detected(self):
+        """追加したメッセージIDは検出され、未追加のIDは検出されない"""
+        import lambda_function
+
+        cache = lambda_function.BoundedMessageCache(capacity=100)
+        for i in range(100):
+            cache.add(f"msg-{i}")
+
+        assert all(f"msg-{i}" in cache for i in range(100))
+        assert not any(f"other-{i}" in cache for i in range(1000))
+
+    def test_size_is_bounded_and_oldest_ids_expire(self):
+        """容量を超えると最も古いIDから破棄される"""
+        import lambda_function
+
+        cache = lambda_function.BoundedMessageCache(capacity=10)
+        for i in range(30):
+            cache.add(f"msg-{i}")
+
+        assert len(cache) == 10
+        assert "msg-29" in cache
+        assert "msg-20" in cache
+        assert "msg-19" not in cache
+
+    @patch.dict(
+        os.environ,
+        {
+            "MEETINGS_TABLE": "test-meetings-table",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
+        },
+    )
+    def test_handler_marks_message_processed(self):
+        """処理したメッセージは以降重複として扱われる"""
+        import lambda_function
+
+        message_data = {"eventType": "test.event"}
+        encoded_data = base64.b64encode(json.dumps(message_data).encode()).decode()
+        event = {
+            "body": json.dumps({
+                "message": {"data": encoded_data, "messageId": "msg-cache-1"},
+            })
+        }
+
+        with patch.object(
+            lambda_function, "processed_messages", lambda_function.BoundedMessageCache()
+        ):
+            lambda_function.lambda_handler(event, None)
+            assert lambda_function.is_duplicate_message("msg-cache-1") is True
+
+
 class TestInvalidPayload:
     """不正なペイロードのテスト"""
 
@@ -245,7 +340,7 @@ class TestInvalidPayload:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
     def test_invalid_json_returns_400(self):
@@ -262,7 +357,7 @@ class TestInvalidPayload:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
     def test_missing_message_returns_400(self):
@@ -283,10 +378,10 @@ class TestUnknownEventType:
         os.environ,
         {
             "MEETINGS_TABLE": "test-meetings-table",
-            "DOWNLOAD_LAMBDA_NAME": "download-recording-lambda",
+            "DOWNLOAD_QUEUE_URL": "https://sqs.ap-northeast-1.amazonaws.com/123456789012/download-queue",
         },
     )
-    @patch("lambda_function.processed_messages", {})
+    @patch("lambda_function.processed_messages", set())
     def test_unknown_event_type_returns_200(self):
         """未知のイベントタイプも 200 で返す"""
         import lambda_function
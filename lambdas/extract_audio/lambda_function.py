@@ -3,13 +3,21 @@ ExtractAudio Lambda Function
 
 動画ファイルから音声を抽出し、16kHz モノラル WAV に変換する。
 
-Version: 2.0 - Python 3.12 compatible
+S3 → ffmpeg → S3 をパイプで直結し、/tmp に一時ファイルを作らない。
+（シークが必要な入力でストリーミングに失敗した場合のみ /tmp 経由で処理する）
+
+Version: 2.2 - Streaming pipeline (stdin input)
 """
 
 import logging
 import os
+import shutil
 import subprocess
-from typing import Any
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import IO, Any
 
 import boto3
 
@@ -27,6 +35,37 @@ OUTPUT_BUCKET = os.environ.get("OUTPUT_BUCKET", "")
 SAMPLE_RATE = 16000
 CHANNELS = 1
 
+# ffmpeg の標準入力へ書き込む単位（バイト）
+STDIN_CHUNK_BYTES = 1024 * 1024
+
+
+def build_ffmpeg_command(input_source: str, output_target: str) -> list[str]:
+    """
+    音声抽出用の ffmpeg コマンドを組み立てる
+
+    Args:
+        input_source: 入力（ファイルパスまたは URL）
+        output_target: 出力（ファイルパスまたは pipe:1）
+
+    Returns:
+        ffmpeg コマンドの引数リスト
+    """
+    return [
+        "ffmpeg",
+        "-nostdin",                 # 標準入力を読まない
+        "-hide_banner",
+        "-loglevel", "error",
+        "-threads", "0",            # 利用可能な vCPU 数に自動調整
+        "-i", input_source,
+        "-vn",                      # 映像ストリームをデコードしない
+        "-ac", str(CHANNELS),       # モノラル
+        "-ar", str(SAMPLE_RATE),    # 16kHz
+        "-acodec", "pcm_s16le",     # 16-bit PCM
+        "-f", "wav",
+        "-y",                        # 上書き
+        output_target,
+    ]
+
 
 def extract_audio(input_path: str, output_path: str) -> None:
     """
@@ -45,17 +84,10 @@ def extract_audio(input_path: str, output_path: str) -> None:
 
     logger.info(f"Extracting audio from {input_path} to {output_path}")
 
-    cmd = [
-        "ffmpeg",
-        "-i", input_path,
-        "-ac", str(CHANNELS),       # モノラル
-        "-ar", str(SAMPLE_RATE),    # 16kHz
-        "-acodec", "pcm_s16le",     # 16-bit PCM
-        "-y",                        # 上書き
-        output_path,
-    ]
+    cmd = build_ffmpeg_command(input_path, output_path)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    # close_fds=True で posix_spawn 経路を使い、fork による RSS 複製を避ける
+    result = subprocess.run(cmd, capture_output=True, text=True, close_fds=True)
 
     if result.returncode != 0:
         logger.error(f"ffmpeg error: {result.stderr}")
@@ -64,6 +96,98 @@ def extract_audio(input_path: str, output_path: str) -> None:
     logger.info(f"Audio extraction completed: {output_path}")
 
 
+def stream_extract_audio(source: IO[bytes], upload: Callable[[IO[bytes]], None]) -> None:
+    """
+    入力ストリームから音声を抽出し、WAV を ffmpeg の標準出力から直接アップロードする
+
+    入力は別スレッドで ffmpeg の標準入力に流し込み、出力はパイプ経由で upload に渡すため
+    ディスクを使わない。標準入力はシークできないため、moov atom が末尾にある MP4 は
+    この経路では読めない（呼び出し側で一時ファイル経由にフォールバックする）。
+
+    Args:
+        source: 入力動画のストリーム（S3 get_object の Body）
+        upload: ffmpeg の標準出力ストリームを受け取ってアップロードする関数
+
+    Raises:
+        RuntimeError: ffmpeg 処理でエラーが発生した場合
+    """
+    logger.info("Streaming audio extraction via ffmpeg pipe")
+
+    cmd = build_ffmpeg_command("pipe:0", "pipe:1")
+
+    # stderr はパイプにしない（読まれないまま 64KB を超えると ffmpeg が停止し、
+    # 標準出力も止まってアップロードが返らなくなる）
+    with (
+        tempfile.TemporaryFile() as stderr_file,
+        subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            close_fds=True,
+        ) as proc,
+        ThreadPoolExecutor(max_workers=1) as executor,
+    ):
+        assert proc.stdin is not None and proc.stdout is not None
+        feeder = executor.submit(_feed_stdin, source, proc.stdin)
+        try:
+            upload(proc.stdout)
+        except BaseException:
+            proc.kill()
+            raise
+        returncode = proc.wait()
+        feed_error = feeder.exception()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace")
+
+    if returncode != 0:
+        logger.error(f"ffmpeg error: {stderr}")
+        raise RuntimeError(f"ffmpeg error: {stderr}")
+    # 入力の読み込みが途中で失敗すると、ffmpeg は途中までの WAV を正常終了で出力してしまう
+    if feed_error is not None:
+        raise RuntimeError(f"Failed to read input stream: {feed_error}") from feed_error
+
+    logger.info("Streaming audio extraction completed")
+
+
+def _feed_stdin(source: IO[bytes], stdin: IO[bytes]) -> None:
+    """入力ストリームを ffmpeg の標準入力に書き込み、終わったら閉じる"""
+    try:
+        shutil.copyfileobj(source, stdin, STDIN_CHUNK_BYTES)
+    except BrokenPipeError:
+        # ffmpeg が先に終了した（失敗は終了コードと stderr で報告される）
+        pass
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def extract_audio_via_tmp(bucket: str, key: str, output_bucket: str, audio_key: str) -> None:
+    """
+    動画を /tmp にダウンロードして音声を抽出し、S3 にアップロードする
+
+    Args:
+        bucket: 入力バケット名
+        key: 入力動画のキー
+        output_bucket: 出力バケット名
+        audio_key: 出力音声ファイルのキー
+    """
+    local_video = "/tmp/input" + os.path.splitext(key)[1]
+    local_audio = "/tmp/audio.wav"
+    try:
+        s3.download_file(bucket, key, local_video)
+        extract_audio(local_video, local_audio)
+        s3.upload_file(local_audio, output_bucket, audio_key)
+    finally:
+        for path in (local_video, local_audio):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Lambda ハンドラー
@@ -94,41 +218,35 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     if not key:
         raise ValueError("Either 'key' or 'video_key' is required")
 
-    # ローカルパス
-    local_video = "/tmp/input.mp4"
-    local_audio = "/tmp/audio.wav"
-
-    try:
-        # S3 から動画をダウンロード
-        logger.info(f"Downloading s3://{bucket}/{key}")
-        s3.download_file(bucket, key, local_video)
-
-        # 音声抽出
-        extract_audio(local_video, local_audio)
-
-        # 出力キーを生成（拡張子を .wav に変更）
-        base_key = key.rsplit(".", 1)[0] if "." in key else key
-        audio_key = f"processed/{base_key}.wav"
+    # 出力キーを生成（拡張子を .wav に変更）
+    base_key = key.rsplit(".", 1)[0] if "." in key else key
+    audio_key = f"processed/{base_key}.wav"
 
-        # 出力バケットを決定
-        output_bucket = OUTPUT_BUCKET if OUTPUT_BUCKET else bucket
+    # 出力バケットを決定
+    output_bucket = OUTPUT_BUCKET if OUTPUT_BUCKET else bucket
 
-        # S3 にアップロード
-        logger.info(f"Uploading to s3://{output_bucket}/{audio_key}")
-        s3.upload_file(local_audio, output_bucket, audio_key)
-
-        result = {
-            "bucket": output_bucket,
-            "audio_key": audio_key,
-            "original_key": key,
-        }
-        # interview_id を次のステップに渡す
-        if interview_id:
-            result["interview_id"] = interview_id
-        return result
-
-    finally:
-        # 一時ファイルをクリーンアップ
-        for path in [local_video, local_audio]:
-            if os.path.exists(path):
-                os.remove(path)
+    # S3 の Body を ffmpeg の標準入力に流し込む（/tmp へのダウンロード不要）
+    logger.info(f"Streaming s3://{bucket}/{key} -> s3://{output_bucket}/{audio_key}")
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+        with closing(body):
+            stream_extract_audio(
+                body,
+                lambda stream: s3.upload_fileobj(stream, output_bucket, audio_key),
+            )
+    except RuntimeError:
+        # ffmpeg 失敗時に途中までアップロードされたオブジェクトを残さない
+        s3.delete_object(Bucket=output_bucket, Key=audio_key)
+        # moov atom が末尾にある MP4 などシークが必要な入力は一時ファイル経由で再試行する
+        logger.warning("Streaming extraction failed; retrying via /tmp")
+        extract_audio_via_tmp(bucket, key, output_bucket, audio_key)
+
+    result = {
+        "bucket": output_bucket,
+        "audio_key": audio_key,
+        "original_key": key,
+    }
+    # interview_id を次のステップに渡す
+    if interview_id:
+        result["interview_id"] = interview_id
+    return result
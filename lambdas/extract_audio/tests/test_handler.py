@@ -4,23 +4,16 @@ ExtractAudio Lambda のテスト
 第5原則: テストファースト
 """
 
-import importlib.util
+import io
 import sys
 from collections.abc import Generator
 from pathlib import Path
+from types import ModuleType
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# このLambdaのlambda_function.pyを動的にインポート
-LAMBDA_DIR = Path(__file__).parent.parent
-spec = importlib.util.spec_from_file_location(
-    "extract_audio_lambda", LAMBDA_DIR / "lambda_function.py"
-)
-if spec and spec.loader:
-    lambda_module = importlib.util.module_from_spec(spec)
-    sys.modules["extract_audio_lambda"] = lambda_module
-    spec.loader.exec_module(lambda_module)
+# lambda_module フィクスチャは lambdas/conftest.py で定義
 
 
 class TestExtractAudio:
@@ -49,7 +42,9 @@ class TestExtractAudio:
         # 実装後に有効化
         pass
 
-    def test_extract_audio_handles_invalid_input(self, tmp_path: Path) -> None:
+    def test_extract_audio_handles_invalid_input(
+        self, lambda_module: ModuleType, tmp_path: Path
+    ) -> None:
         """存在しないファイルでエラーが発生すること"""
         input_path = str(tmp_path / "nonexistent.mp4")
         output_path = str(tmp_path / "output.wav")
@@ -62,13 +57,13 @@ class TestLambdaHandler:
     """Lambda ハンドラーのテスト"""
 
     @pytest.fixture
-    def mock_s3(self) -> Generator[MagicMock, None, None]:
+    def mock_s3(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """S3 クライアントのモック"""
         with patch.object(lambda_module, "s3") as mock:
             yield mock
 
     @pytest.fixture
-    def mock_subprocess(self) -> Generator[MagicMock, None, None]:
+    def mock_subprocess(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """subprocess.run のモック"""
         with patch.object(lambda_module.subprocess, "run") as mock:
             # 成功を返すモック
@@ -76,22 +71,30 @@ class TestLambdaHandler:
             yield mock
 
     @pytest.fixture
-    def mock_os_exists(self) -> Generator[None, None, None]:
-        """os.path.exists と os.remove のモック"""
-        with patch.object(lambda_module.os.path, "exists", return_value=True):
-            with patch.object(lambda_module.os, "remove"):
-                yield None
+    def mock_popen(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
+        """subprocess.Popen のモック（ffmpeg の標準入出力パイプを模擬）"""
+        with patch.object(lambda_module.subprocess, "Popen") as mock:
+            proc = mock.return_value.__enter__.return_value
+            proc.stdin = io.BytesIO()
+            proc.stdin.close = MagicMock()  # 書き込まれた内容を検証できるよう閉じない
+            proc.stdout = io.BytesIO(b"RIFF....WAVE")
+            proc.wait.return_value = 0
+            yield mock
 
     def test_lambda_handler_success(
-        self, mock_s3: MagicMock, mock_subprocess: MagicMock, mock_os_exists: None
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_popen: MagicMock,
     ) -> None:
-        """正常系: S3からダウンロード→処理→S3アップロードが成功すること"""
+        """正常系: S3 → ffmpeg → S3 のストリーミング処理が成功すること"""
         # Given
         event = {
             "bucket": "test-bucket",
             "key": "videos/test.mp4",
         }
         context = MagicMock()
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"video-bytes")}
 
         # When
         result = lambda_module.lambda_handler(event, context)
@@ -100,10 +103,70 @@ class TestLambdaHandler:
         assert result["bucket"] == "test-bucket"
         assert "audio_key" in result
         assert result["audio_key"].endswith(".wav")
-        mock_s3.download_file.assert_called_once()
-        mock_s3.upload_file.assert_called_once()
+        mock_s3.get_object.assert_called_once_with(Bucket="test-bucket", Key="videos/test.mp4")
+        mock_s3.upload_fileobj.assert_called_once()
+        mock_s3.download_file.assert_not_called()
+        mock_s3.upload_file.assert_not_called()
+
+        # ffmpeg は標準入力から読み、標準出力へ書き出す（URL は渡さない）
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[cmd.index("-i") + 1] == "pipe:0"
+        assert cmd[-1] == "pipe:1"
+        assert mock_popen.call_args.kwargs["stderr"] is not lambda_module.subprocess.PIPE
+
+        # S3 の Body が標準入力に流し込まれ、標準出力がそのままアップロードされる
+        proc = mock_popen.return_value.__enter__.return_value
+        assert proc.stdin.getvalue() == b"video-bytes"
+        upload_args = mock_s3.upload_fileobj.call_args[0]
+        assert upload_args[0] is proc.stdout
+        assert upload_args[1:] == ("test-bucket", result["audio_key"])
+
+    def test_lambda_handler_stream_failure_falls_back_to_tmp(
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_popen: MagicMock,
+        mock_subprocess: MagicMock,
+    ) -> None:
+        """ストリーミングに失敗した場合、途中のオブジェクトを削除して /tmp 経由で再試行すること"""
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"video-bytes")}
+        mock_popen.return_value.__enter__.return_value.wait.return_value = 1
+        event = {"bucket": "test-bucket", "key": "videos/test.mp4"}
+
+        with patch.object(lambda_module.os.path, "exists", return_value=True):
+            result = lambda_module.lambda_handler(event, MagicMock())
+
+        mock_s3.delete_object.assert_called_once_with(
+            Bucket="test-bucket", Key="processed/videos/test.wav"
+        )
+        mock_s3.download_file.assert_called_once_with(
+            "test-bucket", "videos/test.mp4", "/tmp/input.mp4"
+        )
+        mock_subprocess.assert_called_once()
+        mock_s3.upload_file.assert_called_once_with(
+            "/tmp/audio.wav", "test-bucket", result["audio_key"]
+        )
+
+    def test_lambda_handler_fallback_failure_raises(
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_popen: MagicMock,
+        mock_subprocess: MagicMock,
+    ) -> None:
+        """/tmp 経由でも ffmpeg が失敗した場合は RuntimeError"""
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"video-bytes")}
+        mock_popen.return_value.__enter__.return_value.wait.return_value = 1
+        mock_subprocess.return_value = MagicMock(returncode=1, stderr="Invalid data found")
+        event = {"bucket": "test-bucket", "key": "videos/test.mp4"}
 
-    def test_lambda_handler_missing_bucket(self) -> None:
+        with patch.object(lambda_module.os.path, "exists", return_value=True):
+            with pytest.raises(RuntimeError, match="Invalid data found"):
+                lambda_module.lambda_handler(event, MagicMock())
+
+        mock_s3.upload_file.assert_not_called()
+
+    def test_lambda_handler_missing_bucket(self, lambda_module: ModuleType) -> None:
         """bucket が指定されていない場合にエラー"""
         event = {"key": "videos/test.mp4"}
         context = MagicMock()
@@ -111,7 +174,7 @@ class TestLambdaHandler:
         with pytest.raises(KeyError):
             lambda_module.lambda_handler(event, context)
 
-    def test_lambda_handler_missing_key(self) -> None:
+    def test_lambda_handler_missing_key(self, lambda_module: ModuleType) -> None:
         """key が指定されていない場合にエラー"""
         event = {"bucket": "test-bucket"}
         context = MagicMock()
@@ -120,9 +183,13 @@ class TestLambdaHandler:
             lambda_module.lambda_handler(event, context)
 
     def test_lambda_handler_returns_correct_output_key(
-        self, mock_s3: MagicMock, mock_subprocess: MagicMock, mock_os_exists: None
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_popen: MagicMock,
     ) -> None:
         """出力キーが正しい形式であること"""
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(b"video-bytes")}
         event = {
             "bucket": "test-bucket",
             "key": "videos/meeting_2024.mp4",
@@ -135,7 +202,7 @@ class TestLambdaHandler:
         assert result["audio_key"] == "processed/videos/meeting_2024.wav"
 
     def test_extract_audio_calls_ffmpeg_correctly(
-        self, mock_subprocess: MagicMock, tmp_path: Path
+        self, lambda_module: ModuleType, mock_subprocess: MagicMock, tmp_path: Path
     ) -> None:
         """ffmpeg が正しいオプションで呼び出されること"""
         input_path = str(tmp_path / "input.mp4")
@@ -157,6 +224,62 @@ class TestLambdaHandler:
         assert "1" in call_args  # モノラル
         assert "-ar" in call_args
         assert "16000" in call_args  # 16kHz
+        assert "-nostdin" in call_args
+        assert "-vn" in call_args  # 映像デコードなし
+        threads_idx = call_args.index("-threads")
+        assert call_args[threads_idx + 1] == "0"
+        assert mock_subprocess.call_args.kwargs["close_fds"] is True
+
+
+class TestStreamExtractAudio:
+    """stream_extract_audio のパイプ処理のテスト（ffmpeg の代わりに Python プロセスを使う）"""
+
+    def test_large_stderr_does_not_block_stdout(
+        self, lambda_module: ModuleType, tmp_path: Path
+    ) -> None:
+        """stderr に大量に書き出すプロセスでも標準入出力のパイプが詰まらないこと"""
+        script = (
+            "import sys; sys.stderr.write('w' * 512 * 1024); sys.stderr.flush(); "
+            "sys.stdout.buffer.write(sys.stdin.buffer.read())"
+        )
+        source = io.BytesIO(b"x" * (3 * 1024 * 1024))
+        uploaded = io.BytesIO()
+
+        with patch.object(
+            lambda_module,
+            "build_ffmpeg_command",
+            return_value=[sys.executable, "-c", script],
+        ):
+            lambda_module.stream_extract_audio(source, lambda s: uploaded.write(s.read()))
+
+        assert uploaded.getvalue() == source.getvalue()
+
+    def test_failure_reports_stderr(self, lambda_module: ModuleType) -> None:
+        """プロセスが失敗した場合、stderr の内容を RuntimeError に含めること"""
+        script = "import sys; sys.stderr.write('moov atom not found'); sys.exit(1)"
+
+        with patch.object(
+            lambda_module,
+            "build_ffmpeg_command",
+            return_value=[sys.executable, "-c", script],
+        ):
+            with pytest.raises(RuntimeError, match="moov atom not found"):
+                lambda_module.stream_extract_audio(
+                    io.BytesIO(b"x" * (1024 * 1024)), lambda s: s.read()
+                )
+
+    def test_input_read_error_raises(self, lambda_module: ModuleType) -> None:
+        """入力ストリームの読み込みに失敗した場合、途中までの出力を成功扱いしないこと"""
+        source = MagicMock()
+        source.read.side_effect = OSError("connection reset")
+
+        with patch.object(
+            lambda_module,
+            "build_ffmpeg_command",
+            return_value=[sys.executable, "-c", "import sys; sys.stdin.buffer.read()"],
+        ):
+            with pytest.raises(RuntimeError, match="connection reset"):
+                lambda_module.stream_extract_audio(source, lambda s: s.read())
 
 
 class TestIntegration:
@@ -6,13 +6,100 @@ and segments from interview data. These are derived values that
 should not be stored but computed on demand.
 """
 
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    from models import HEMSInterviewData, Segment
-
+from models import (
+    BAD_SIGNAL_MASK,
+    GOOD_SIGNAL_MASK,
+    AppUsageFrequency,
+    BillCheckFrequency,
+    ReplacementIntention,
+    Segment,
+)
 
-def compute_scoring_conditions(data: "HEMSInterviewData") -> dict[str, bool]:
+if TYPE_CHECKING:
+    from models import HEMSInterviewData, SignalDetails
+
+# Accepted enum members for each condition. Legacy strings are normalized
+# to members by the models' _missing_ hooks before they reach this module.
+_BILL_MONTHLY = frozenset({BillCheckFrequency.MONTHLY})
+_APP_WEEKLY_3X = frozenset({AppUsageFrequency.DAILY, AppUsageFrequency.WEEKLY_FEW})
+_REPLACE_IMMEDIATE = frozenset({ReplacementIntention.IMMEDIATE})
+_GADGET_CATEGORIES = frozenset({"ガジェット", "テクノロジー", "gadget", "technology"})
+
+_MAX_TOTAL_SCORE = 30
+_JUDGMENT_LUT: tuple[str, ...] = tuple(
+    "最優先ターゲット" if score >= 25
+    else "有望ターゲット" if score >= 18
+    else "要検討" if score >= 12
+    else "ターゲット外"
+    for score in range(_MAX_TOTAL_SCORE + 1)
+)
+
+# (score name, ((condition, weight), ...)); each sub-score maxes out at 10
+_SCORE_WEIGHTS: tuple[tuple[str, tuple[tuple[str, int], ...]], ...] = (
+    (
+        "electricity_interest_score",
+        (
+            ("can_recall_recent_bill", 2),
+            ("has_two_or_more_actions", 3),
+            ("has_switched_company", 3),
+            ("checks_bill_monthly", 2),
+        ),
+    ),
+    (
+        "engagement_score",
+        (
+            ("uses_app_weekly_3x", 3),
+            ("has_3_or_more_automations", 2),
+            ("has_5_or_more_devices", 2),
+            ("would_replace_immediately", 3),
+        ),
+    ),
+    (
+        "crowdfunding_fit_score",
+        (
+            ("has_crowdfunding_exp", 3),
+            ("crowdfunding_3_or_more", 2),
+            ("crowdfunding_10k_plus", 2),
+            ("crowdfunding_gadget", 3),
+        ),
+    ),
+)
+
+
+@dataclass(slots=True, frozen=True)
+class ScoringConditions:
+    """Condition achievements that feed the three sub-scores."""
+
+    # Electricity Interest
+    can_recall_recent_bill: bool = False
+    has_two_or_more_actions: bool = False
+    has_switched_company: bool = False
+    checks_bill_monthly: bool = False
+    # Engagement
+    uses_app_weekly_3x: bool = False
+    has_3_or_more_automations: bool = False
+    has_5_or_more_devices: bool = False
+    would_replace_immediately: bool = False
+    # Crowdfunding
+    has_crowdfunding_exp: bool = False
+    crowdfunding_3_or_more: bool = False
+    crowdfunding_10k_plus: bool = False
+    crowdfunding_gadget: bool = False
+
+    def __getitem__(self, key: str) -> bool:
+        """Dict-style access kept for callers written against the old dict return."""
+        return bool(getattr(self, key))
+
+    def to_dict(self) -> dict[str, bool]:
+        """Return the conditions as a plain dict (for JSON output)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def compute_scoring_conditions(data: "HEMSInterviewData") -> ScoringConditions:
     """
     Compute scoring condition achievements from fact fields.
 
@@ -20,14 +107,8 @@ def compute_scoring_conditions(data: "HEMSInterviewData") -> dict[str, bool]:
         data: HEMSInterviewData containing fact fields
 
     Returns:
-        Dictionary of condition name to boolean achievement status
+        ScoringConditions with each condition's achievement status
     """
-    from models import (
-        AppUsageFrequency,
-        BillCheckFrequency,
-        ReplacementIntention,
-    )
-
     ec = data.electricity_cost
     di = data.device_info
     cf = data.crowdfunding_experience
@@ -36,110 +117,60 @@ def compute_scoring_conditions(data: "HEMSInterviewData") -> dict[str, bool]:
     can_recall_recent_bill = ec.recent_monthly_cost is not None
     has_two_or_more_actions = len(ec.past_year_actions or []) >= 2
     has_switched_company = ec.has_switched_company is True
-
-    # Handle both enum and string for backward compatibility
-    bill_freq = ec.bill_check_frequency
-    if isinstance(bill_freq, BillCheckFrequency):
-        checks_bill_monthly = bill_freq == BillCheckFrequency.MONTHLY
-    else:
-        checks_bill_monthly = bill_freq in ["monthly", "毎月"]
+    checks_bill_monthly = ec.bill_check_frequency in _BILL_MONTHLY
 
     # Engagement Conditions (10 points max)
-    app_freq = di.app_usage_frequency
-    if isinstance(app_freq, AppUsageFrequency):
-        uses_app_weekly_3x = app_freq in [
-            AppUsageFrequency.DAILY,
-            AppUsageFrequency.WEEKLY_FEW,
-        ]
-    else:
-        uses_app_weekly_3x = app_freq in ["daily", "weekly_few", "毎日", "週数回"]
+    uses_app_weekly_3x = di.app_usage_frequency in _APP_WEEKLY_3X
 
     has_3_or_more_automations = (di.automation_count or 0) >= 3
     has_5_or_more_devices = (di.connected_devices_count or 0) >= 5
 
-    replacement = di.replacement_intention
-    if isinstance(replacement, ReplacementIntention):
-        would_replace_immediately = replacement == ReplacementIntention.IMMEDIATE
-    else:
-        would_replace_immediately = replacement in ["immediate", "即買い直す"]
+    would_replace_immediately = di.replacement_intention in _REPLACE_IMMEDIATE
 
     # Crowdfunding Conditions (10 points max)
     has_crowdfunding_exp = cf.has_crowdfunding_experience is True
     crowdfunding_3_or_more = (cf.crowdfunding_count or 0) >= 3
     crowdfunding_10k_plus = (cf.average_support_amount or 0) >= 10000
 
-    supported_categories = cf.supported_categories or []
-    crowdfunding_gadget = any(
-        cat in ["ガジェット", "テクノロジー", "gadget", "technology"]
-        for cat in supported_categories
-    )
+    supported_categories: list[str] = cf.supported_categories or []
+    crowdfunding_gadget = not _GADGET_CATEGORIES.isdisjoint(supported_categories)
 
-    return {
+    return ScoringConditions(
         # Electricity Interest
-        "can_recall_recent_bill": can_recall_recent_bill,
-        "has_two_or_more_actions": has_two_or_more_actions,
-        "has_switched_company": has_switched_company,
-        "checks_bill_monthly": checks_bill_monthly,
+        can_recall_recent_bill=can_recall_recent_bill,
+        has_two_or_more_actions=has_two_or_more_actions,
+        has_switched_company=has_switched_company,
+        checks_bill_monthly=checks_bill_monthly,
         # Engagement
-        "uses_app_weekly_3x": uses_app_weekly_3x,
-        "has_3_or_more_automations": has_3_or_more_automations,
-        "has_5_or_more_devices": has_5_or_more_devices,
-        "would_replace_immediately": would_replace_immediately,
+        uses_app_weekly_3x=uses_app_weekly_3x,
+        has_3_or_more_automations=has_3_or_more_automations,
+        has_5_or_more_devices=has_5_or_more_devices,
+        would_replace_immediately=would_replace_immediately,
         # Crowdfunding
-        "has_crowdfunding_exp": has_crowdfunding_exp,
-        "crowdfunding_3_or_more": crowdfunding_3_or_more,
-        "crowdfunding_10k_plus": crowdfunding_10k_plus,
-        "crowdfunding_gadget": crowdfunding_gadget,
-    }
+        has_crowdfunding_exp=has_crowdfunding_exp,
+        crowdfunding_3_or_more=crowdfunding_3_or_more,
+        crowdfunding_10k_plus=crowdfunding_10k_plus,
+        crowdfunding_gadget=crowdfunding_gadget,
+    )
 
 
-def compute_scores_from_conditions(conditions: dict[str, bool]) -> dict[str, int]:
+def compute_scores_from_conditions(conditions: ScoringConditions) -> dict[str, int]:
     """
     Compute scores from condition achievements.
 
     Args:
-        conditions: Dictionary of condition name to boolean
+        conditions: ScoringConditions
 
     Returns:
         Dictionary with electricity_interest_score, engagement_score,
         crowdfunding_fit_score, and total_score
     """
-    # Electricity Interest Score (max 10)
-    electricity = sum(
-        [
-            2 if conditions.get("can_recall_recent_bill", False) else 0,
-            3 if conditions.get("has_two_or_more_actions", False) else 0,
-            3 if conditions.get("has_switched_company", False) else 0,
-            2 if conditions.get("checks_bill_monthly", False) else 0,
-        ]
-    )
-
-    # Engagement Score (max 10)
-    engagement = sum(
-        [
-            3 if conditions.get("uses_app_weekly_3x", False) else 0,
-            2 if conditions.get("has_3_or_more_automations", False) else 0,
-            2 if conditions.get("has_5_or_more_devices", False) else 0,
-            3 if conditions.get("would_replace_immediately", False) else 0,
-        ]
-    )
-
-    # Crowdfunding Fit Score (max 10)
-    crowdfunding = sum(
-        [
-            3 if conditions.get("has_crowdfunding_exp", False) else 0,
-            2 if conditions.get("crowdfunding_3_or_more", False) else 0,
-            2 if conditions.get("crowdfunding_10k_plus", False) else 0,
-            3 if conditions.get("crowdfunding_gadget", False) else 0,
-        ]
-    )
-
-    return {
-        "electricity_interest_score": electricity,
-        "engagement_score": engagement,
-        "crowdfunding_fit_score": crowdfunding,
-        "total_score": electricity + engagement + crowdfunding,
+    scores = {
+        score_name: sum(weight for key, weight in weights if getattr(conditions, key))
+        for score_name, weights in _SCORE_WEIGHTS
     }
+    scores["total_score"] = sum(scores.values())
+    return scores
 
 
 def compute_judgment_label(total_score: int) -> str:
@@ -152,19 +183,11 @@ def compute_judgment_label(total_score: int) -> str:
     Returns:
         Judgment label string
     """
-    if total_score >= 25:
-        return "最優先ターゲット"
-    elif total_score >= 18:
-        return "有望ターゲット"
-    elif total_score >= 12:
-        return "要検討"
-    else:
-        return "ターゲット外"
-
-
-def compute_segment(
-    conditions: dict[str, bool], scores: dict[str, int]
-) -> "Segment":
+    # Clamp so out-of-range scores keep the open-ended threshold semantics
+    return _JUDGMENT_LUT[min(max(total_score, 0), _MAX_TOTAL_SCORE)]
+
+
+def compute_segment(conditions: ScoringConditions, scores: dict[str, int]) -> Segment:
     """
     Compute segment classification from conditions and scores.
 
@@ -175,25 +198,38 @@ def compute_segment(
     - D: ライト層 = app_monthly_or_less AND automation <= 1
 
     Args:
-        conditions: Dictionary of condition achievements
+        conditions: ScoringConditions
         scores: Dictionary of computed scores
 
     Returns:
         Segment enum value
     """
-    from models import Segment
+    # Only five inputs decide the segment, so the key space is small enough to
+    # cache every pattern a batch run can produce.
+    return _segment_cached(
+        conditions.has_switched_company,
+        conditions.has_crowdfunding_exp,
+        conditions.has_5_or_more_devices,
+        scores.get("electricity_interest_score", 0),
+        scores.get("engagement_score", 0),
+    )
 
-    electricity_score = scores.get("electricity_interest_score", 0)
-    engagement_score = scores.get("engagement_score", 0)
 
+@lru_cache(maxsize=4096)
+def _segment_cached(
+    has_switched_company: bool,
+    has_crowdfunding_exp: bool,
+    has_5_or_more_devices: bool,
+    electricity_score: int,
+    engagement_score: int,
+) -> Segment:
+    """Segment decision tree behind compute_segment (memoized)."""
     # Check Segment A: High Energy Awareness
-    if electricity_score >= 7 and conditions.get("has_switched_company", False):
+    if electricity_score >= 7 and has_switched_company:
         return Segment.A
 
     # Check Segment B: Gadget Lover
-    if conditions.get("has_crowdfunding_exp", False) and conditions.get(
-        "has_5_or_more_devices", False
-    ):
+    if has_crowdfunding_exp and has_5_or_more_devices:
         return Segment.B
 
     # Check Segment C: Convenience Seeker
@@ -214,16 +250,8 @@ def compute_good_signal_count(signal_details: "SignalDetails") -> int:
     Returns:
         Count of true good signals (0-4 for fixed, plus additional)
     """
-    count = sum(
-        [
-            1 if signal_details.good_took_cost_action else 0,
-            1 if signal_details.good_uses_app_weekly else 0,
-            1 if signal_details.good_has_crowdfunding_exp else 0,
-            1 if signal_details.good_would_replace_immediately else 0,
-        ]
-    )
-    count += len(signal_details.additional_good_signals or [])
-    return count
+    fixed = (signal_details.signal_bits & GOOD_SIGNAL_MASK).bit_count()
+    return fixed + len(signal_details.additional_good_signals or [])
 
 
 def compute_bad_signal_count(signal_details: "SignalDetails") -> int:
@@ -236,16 +264,8 @@ def compute_bad_signal_count(signal_details: "SignalDetails") -> int:
     Returns:
         Count of true bad signals (0-4 for fixed, plus additional)
     """
-    count = sum(
-        [
-            1 if signal_details.bad_no_past_action else 0,
-            1 if signal_details.bad_no_bill_check_6months else 0,
-            1 if signal_details.bad_device_barely_used else 0,
-            1 if signal_details.bad_said_will_consider else 0,
-        ]
-    )
-    count += len(signal_details.additional_bad_signals or [])
-    return count
+    fixed = (signal_details.signal_bits & BAD_SIGNAL_MASK).bit_count()
+    return fixed + len(signal_details.additional_bad_signals or [])
 
 
 def compute_all_derived_fields(data: "HEMSInterviewData") -> dict:
@@ -272,7 +292,7 @@ def compute_all_derived_fields(data: "HEMSInterviewData") -> dict:
     segment = compute_segment(conditions, scores)
 
     result = {
-        "scoring_conditions": conditions,
+        "scoring_conditions": conditions.to_dict(),
         "computed_scores": scores,
         "judgment_label": judgment,
         "segment": segment,
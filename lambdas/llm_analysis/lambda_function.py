@@ -17,7 +17,7 @@ import boto3
 import openai
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from models import HEMSInterviewData
+from models import HEMS_ADAPTER, TRANSCRIPT_ADAPTER, HEMSInterviewData, TranscriptSegment
 from progress import update_progress
 
 # ロガー設定
@@ -174,7 +174,7 @@ def get_openai_client() -> openai.OpenAI:
     wait=wait_exponential(multiplier=1, min=4, max=60),
     stop=stop_after_attempt(3),
 )
-def analyze_transcript_structured(transcript: list[dict]) -> HEMSInterviewData:
+def analyze_transcript_structured(transcript: list[TranscriptSegment]) -> HEMSInterviewData:
     """
     文字起こしを構造化分析（Structured Outputs 使用）
 
@@ -185,7 +185,7 @@ def analyze_transcript_structured(transcript: list[dict]) -> HEMSInterviewData:
         HEMSInterviewData: 構造化されたインタビューデータ
     """
     # 話者ごとの発言を整形
-    full_text = "\n".join([f"[{t['speaker']}] {t['text']}" for t in transcript])
+    full_text = "\n".join([f"[{t.speaker}] {t.text}" for t in transcript])
 
     logger.info(f"Analyzing transcript with {len(transcript)} segments (structured)...")
 
@@ -220,7 +220,7 @@ def analyze_transcript_structured(transcript: list[dict]) -> HEMSInterviewData:
     wait=wait_exponential(multiplier=1, min=4, max=60),
     stop=stop_after_attempt(3),
 )
-def analyze_transcript_text(transcript: list[dict], prompt: str) -> str:
+def analyze_transcript_text(transcript: list[TranscriptSegment], prompt: str) -> str:
     """
     文字起こしをテキスト分析（従来方式）
 
@@ -232,7 +232,7 @@ def analyze_transcript_text(transcript: list[dict], prompt: str) -> str:
         分析結果（テキスト）
     """
     # 話者ごとの発言を整形
-    full_text = "\n".join([f"[{t['speaker']}] {t['text']}" for t in transcript])
+    full_text = "\n".join([f"[{t.speaker}] {t.text}" for t in transcript])
 
     logger.info(f"Analyzing transcript with {len(transcript)} segments (text)...")
 
@@ -359,7 +359,8 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     # S3 から文字起こしを取得
     logger.info(f"Getting transcript from s3://{bucket}/{transcript_key}")
     response = s3.get_object(Bucket=bucket, Key=transcript_key)
-    transcript = json.loads(response["Body"].read().decode("utf-8"))
+    # JSON パースと検証を pydantic-core で1パスで行う
+    transcript = TRANSCRIPT_ADAPTER.validate_json(response["Body"].read())
 
     # 出力バケットを決定
     output_bucket = OUTPUT_BUCKET if OUTPUT_BUCKET else bucket
@@ -373,13 +374,14 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
         # JSON として保存
         analysis_key = f"analysis/{base_key.replace('_transcript', '')}_structured.json"
-        json_content = structured_data.model_dump_json(indent=2, ensure_ascii=False)
+        # pydantic-core が UTF-8 バイト列を直接生成する（str 経由の encode を省く）
+        json_content = HEMS_ADAPTER.dump_json(structured_data, indent=2)
 
         logger.info(f"Uploading structured analysis to s3://{output_bucket}/{analysis_key}")
         s3.put_object(
             Bucket=output_bucket,
             Key=analysis_key,
-            Body=json_content.encode("utf-8"),
+            Body=json_content,
             ContentType="application/json; charset=utf-8",
         )
 
@@ -11,10 +11,10 @@ v2 Changes:
 - Removed good_signals/bad_signals from Insights (moved to SignalDetails)
 """
 
-from enum import Enum
-from typing import Optional, Union
+from enum import Enum, StrEnum
+from typing import Annotated, Any, Final, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter
 
 
 # =============================================================================
@@ -22,7 +22,17 @@ from pydantic import BaseModel, Field
 # =============================================================================
 
 
-class BillCheckFrequency(str, Enum):
+class _LegacyAliasEnum(StrEnum):
+    """旧データの日本語表記を enum メンバーに解決する基底クラス"""
+
+    @classmethod
+    def _missing_(cls, value: object) -> Optional["_LegacyAliasEnum"]:
+        if not isinstance(value, str):
+            return None
+        return _LEGACY_LOOKUP.get((cls, value))
+
+
+class BillCheckFrequency(_LegacyAliasEnum):
     """明細確認頻度"""
 
     MONTHLY = "monthly"  # 毎月
@@ -30,7 +40,7 @@ class BillCheckFrequency(str, Enum):
     RARELY = "rarely"  # ほぼ見ない
 
 
-class AppUsageFrequency(str, Enum):
+class AppUsageFrequency(_LegacyAliasEnum):
     """アプリ利用頻度"""
 
     DAILY = "daily"  # 毎日
@@ -39,7 +49,7 @@ class AppUsageFrequency(str, Enum):
     RARELY = "rarely"  # ほぼ開かない
 
 
-class ReplacementIntention(str, Enum):
+class ReplacementIntention(_LegacyAliasEnum):
     """故障時買替意向"""
 
     IMMEDIATE = "immediate"  # 即買い直す
@@ -47,7 +57,7 @@ class ReplacementIntention(str, Enum):
     NO_REPLACE = "no_replace"  # 買い直さない
 
 
-class PurchaseChannel(str, Enum):
+class PurchaseChannel(_LegacyAliasEnum):
     """購入チャネル"""
 
     AMAZON = "amazon"
@@ -57,7 +67,7 @@ class PurchaseChannel(str, Enum):
     OTHER = "other"
 
 
-class PurchaseTiming(str, Enum):
+class PurchaseTiming(_LegacyAliasEnum):
     """購入時期"""
 
     WITHIN_3_MONTHS = "within_3_months"
@@ -67,7 +77,7 @@ class PurchaseTiming(str, Enum):
     UNKNOWN = "unknown"
 
 
-class Segment(str, Enum):
+class Segment(_LegacyAliasEnum):
     """セグメント分類"""
 
     A = "A"  # 省エネ意識高
@@ -76,14 +86,104 @@ class Segment(str, Enum):
     D = "D"  # ライト層
 
 
+# v1 で保存された日本語表記（enum 導入前の自由記述）→ enum メンバー
+_LEGACY_ALIASES: Final[dict[type[Enum], dict[str, Enum]]] = {
+    BillCheckFrequency: {
+        "毎月": BillCheckFrequency.MONTHLY,
+        "数ヶ月に1回": BillCheckFrequency.FEW_MONTHS,
+        "ほぼ見ない": BillCheckFrequency.RARELY,
+    },
+    AppUsageFrequency: {
+        "毎日": AppUsageFrequency.DAILY,
+        "週数回": AppUsageFrequency.WEEKLY_FEW,
+        "月数回": AppUsageFrequency.MONTHLY_FEW,
+        "ほぼ開かない": AppUsageFrequency.RARELY,
+    },
+    ReplacementIntention: {
+        "即買い直す": ReplacementIntention.IMMEDIATE,
+        "検討する": ReplacementIntention.CONSIDER,
+        "買い直さない": ReplacementIntention.NO_REPLACE,
+    },
+    PurchaseChannel: {
+        "Amazon": PurchaseChannel.AMAZON,
+        "家電量販店": PurchaseChannel.ELECTRONICS_STORE,
+        "公式サイト": PurchaseChannel.OFFICIAL_SITE,
+        "住宅メーカー経由": PurchaseChannel.BUILDER,
+        "その他": PurchaseChannel.OTHER,
+    },
+    PurchaseTiming: {
+        "3ヶ月以内": PurchaseTiming.WITHIN_3_MONTHS,
+        "6ヶ月以内": PurchaseTiming.WITHIN_6_MONTHS,
+        "1年以内": PurchaseTiming.WITHIN_1_YEAR,
+        "1年以上前": PurchaseTiming.OVER_1_YEAR,
+        "不明": PurchaseTiming.UNKNOWN,
+    },
+    Segment: {
+        "A:省エネ意識高": Segment.A,
+        "B:ガジェット好き": Segment.B,
+        "C:便利さ追求": Segment.C,
+        "D:ライト層": Segment.D,
+    },
+}
+
+# _missing_ 用に (enum クラス, 旧表記) をキーにした1段の辞書へ展開しておく
+_LEGACY_LOOKUP: Final[dict[tuple[type[Enum], str], Enum]] = {
+    (enum_cls, alias): member
+    for enum_cls, aliases in _LEGACY_ALIASES.items()
+    for alias, member in aliases.items()
+}
+
+
+# =============================================================================
+# Constrained Types
+# =============================================================================
+
+_YEN_AMOUNT_MAX: Final = 10_000_000
+_SMALL_COUNT_MAX: Final = 100_000
+
+
+def _null_if_out_of_range(upper: int) -> BeforeValidator:
+    """範囲外の数値を None（不明）に置き換える
+
+    LLM が1項目だけ桁違いの値を返しても、解析全体を ValidationError で失敗させない
+    """
+
+    def validate(value: Any) -> Any:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if not 0 <= value <= upper:
+                return None
+        return value
+
+    return BeforeValidator(validate)
+
+
+# 金額（円）と回数/分数の上限。i32 に収まる範囲に絞る
+# 上下限は Structured Outputs のスキーマにも minimum/maximum として出力される
+YenAmount = Annotated[
+    Optional[Annotated[int, Field(ge=0, le=_YEN_AMOUNT_MAX)]],
+    _null_if_out_of_range(_YEN_AMOUNT_MAX),
+]
+SmallCount = Annotated[
+    Optional[Annotated[int, Field(ge=0, le=_SMALL_COUNT_MAX)]],
+    _null_if_out_of_range(_SMALL_COUNT_MAX),
+]
+
+
 # =============================================================================
 # Model Definitions
 # =============================================================================
+# 全モデルで1つの設定を共有する。
+# - defer_build: スキーマ構築を初回利用まで遅延する（import 時は HEMS_ADAPTER のみ構築）
+# - frozen: LLM 出力後は変更しない
+# - extra="ignore": 未知のキーはエラーにせず読み捨てる
+_HEMS_CONFIG = ConfigDict(defer_build=True, frozen=True, extra="ignore")
 
 
 class BasicAttributes(BaseModel):
     """基本属性"""
 
+    model_config = _HEMS_CONFIG
+
     age: Optional[int] = Field(None, description="年齢")
     household_size: Optional[int] = Field(None, description="世帯人数")
     residence_type: Optional[str] = Field(
@@ -102,13 +202,15 @@ class BasicAttributes(BaseModel):
 class ElectricityCost(BaseModel):
     """電気代関連"""
 
-    recent_monthly_cost: Optional[int] = Field(None, description="直近の電気代（月額円）")
-    summer_peak_cost: Optional[int] = Field(None, description="夏のピーク月電気代（円）")
-    winter_peak_cost: Optional[int] = Field(None, description="冬のピーク月電気代（円）")
+    model_config = _HEMS_CONFIG
+
+    recent_monthly_cost: Optional[YenAmount] = Field(None, description="直近の電気代（月額円）")
+    summer_peak_cost: Optional[YenAmount] = Field(None, description="夏のピーク月電気代（円）")
+    winter_peak_cost: Optional[YenAmount] = Field(None, description="冬のピーク月電気代（円）")
     power_company: Optional[str] = Field(None, description="電力会社名")
     has_switched_company: Optional[bool] = Field(None, description="電力会社切替経験")
-    # Accept both enum and string for backward compatibility
-    bill_check_frequency: Optional[Union[BillCheckFrequency, str]] = Field(
+    # Legacy Japanese strings are resolved by BillCheckFrequency._missing_
+    bill_check_frequency: Optional[BillCheckFrequency] = Field(
         None, description="明細確認頻度（monthly/few_months/rarely）"
     )
     pain_score: Optional[int] = Field(
@@ -117,7 +219,7 @@ class ElectricityCost(BaseModel):
     past_year_actions: list[str] = Field(
         default_factory=list, description="過去1年の電気代削減行動リスト"
     )
-    saving_from_switch: Optional[int] = Field(None, description="切替による削減額（円）")
+    saving_from_switch: Optional[YenAmount] = Field(None, description="切替による削減額（円）")
     purchased_items_for_saving: list[str] = Field(
         default_factory=list, description="節電のための購入物リスト"
     )
@@ -126,20 +228,22 @@ class ElectricityCost(BaseModel):
 class DeviceInfo(BaseModel):
     """デバイス関連"""
 
+    model_config = _HEMS_CONFIG
+
     devices_used: list[str] = Field(
         default_factory=list, description="利用デバイス（Nature Remo/SwitchBot/AiSEG等）"
     )
     purchase_date: Optional[str] = Field(None, description="購入時期（YYYY-MM形式）")
-    purchase_amount: Optional[int] = Field(None, description="購入金額（総額円）")
-    # Accept both enum and string for backward compatibility
-    purchase_channel: Optional[Union[PurchaseChannel, str]] = Field(
+    purchase_amount: Optional[YenAmount] = Field(None, description="購入金額（総額円）")
+    # Legacy Japanese strings are resolved by each enum's _missing_
+    purchase_channel: Optional[PurchaseChannel] = Field(
         None, description="購入チャネル（amazon/electronics_store/official_site/builder/other）"
     )
-    app_usage_frequency: Optional[Union[AppUsageFrequency, str]] = Field(
+    app_usage_frequency: Optional[AppUsageFrequency] = Field(
         None, description="アプリ起動頻度（daily/weekly_few/monthly_few/rarely）"
     )
-    connected_devices_count: Optional[int] = Field(None, description="連携家電数")
-    automation_count: Optional[int] = Field(None, description="オートメーション設定数")
+    connected_devices_count: Optional[SmallCount] = Field(None, description="連携家電数")
+    automation_count: Optional[SmallCount] = Field(None, description="オートメーション設定数")
     most_used_feature: Optional[str] = Field(None, description="最頻使用機能")
     satisfaction_points: list[str] = Field(
         default_factory=list, description="満足ポイント（トップ3）"
@@ -150,8 +254,8 @@ class DeviceInfo(BaseModel):
     unused_features: list[str] = Field(
         default_factory=list, description="使わなくなった機能"
     )
-    initial_setup_time_minutes: Optional[int] = Field(None, description="初期設定時間（分）")
-    replacement_intention: Optional[Union[ReplacementIntention, str]] = Field(
+    initial_setup_time_minutes: Optional[SmallCount] = Field(None, description="初期設定時間（分）")
+    replacement_intention: Optional[ReplacementIntention] = Field(
         None, description="故障時買替意向（immediate/consider/no_replace）"
     )
 
@@ -159,18 +263,20 @@ class DeviceInfo(BaseModel):
 class PriceSensitivity(BaseModel):
     """価格感覚（構造化版）"""
 
+    model_config = _HEMS_CONFIG
+
     # Structured price ranges (min/max)
-    cheap_min: Optional[int] = Field(None, description="安いと感じる価格帯の下限（円）")
-    cheap_max: Optional[int] = Field(None, description="安いと感じる価格帯の上限（円）")
-    fair_min: Optional[int] = Field(None, description="妥当と感じる価格帯の下限（円）")
-    fair_max: Optional[int] = Field(None, description="妥当と感じる価格帯の上限（円）")
-    expensive_min: Optional[int] = Field(None, description="高いと感じる価格帯の下限（円）")
-    expensive_max: Optional[int] = Field(None, description="高いと感じる価格帯の上限（円）")
+    cheap_min: Optional[YenAmount] = Field(None, description="安いと感じる価格帯の下限（円）")
+    cheap_max: Optional[YenAmount] = Field(None, description="安いと感じる価格帯の上限（円）")
+    fair_min: Optional[YenAmount] = Field(None, description="妥当と感じる価格帯の下限（円）")
+    fair_max: Optional[YenAmount] = Field(None, description="妥当と感じる価格帯の上限（円）")
+    expensive_min: Optional[YenAmount] = Field(None, description="高いと感じる価格帯の下限（円）")
+    expensive_max: Optional[YenAmount] = Field(None, description="高いと感じる価格帯の上限（円）")
 
     # Purchase info
-    max_purchase_price: Optional[int] = Field(None, description="購入上限価格（円）")
-    actual_purchase_price: Optional[int] = Field(None, description="実購入金額（円）")
-    purchase_timing: Optional[Union[PurchaseTiming, str]] = Field(
+    max_purchase_price: Optional[YenAmount] = Field(None, description="購入上限価格（円）")
+    actual_purchase_price: Optional[YenAmount] = Field(None, description="実購入金額（円）")
+    purchase_timing: Optional[PurchaseTiming] = Field(
         None, description="購入時期（within_3_months/within_6_months/within_1_year/over_1_year/unknown）"
     )
     purchase_timing_note: Optional[str] = Field(
@@ -181,6 +287,8 @@ class PriceSensitivity(BaseModel):
 class Scoring(BaseModel):
     """スコアリング（LLM出力、検証用）"""
 
+    model_config = _HEMS_CONFIG
+
     electricity_interest_score: Optional[int] = Field(
         None, ge=0, le=10, description="電気代関心度スコア（0-10）"
     )
@@ -200,15 +308,32 @@ class Scoring(BaseModel):
         None, description="クラファン適合スコアの算出根拠"
     )
     total_score: Optional[int] = Field(None, ge=0, le=30, description="総合スコア（0-30）")
-    segment: Optional[Union[Segment, str]] = Field(
+    segment: Optional[Segment] = Field(
         None, description="セグメント（A/B/C/D）"
     )
     segment_reason: Optional[str] = Field(None, description="セグメント判定理由")
 
 
+# SignalDetails の固定8シグナルのビット位置（下位4bit: Good、上位4bit: Bad）
+SIGNAL_FIELDS: tuple[str, ...] = (
+    "good_took_cost_action",
+    "good_uses_app_weekly",
+    "good_has_crowdfunding_exp",
+    "good_would_replace_immediately",
+    "bad_no_past_action",
+    "bad_no_bill_check_6months",
+    "bad_device_barely_used",
+    "bad_said_will_consider",
+)
+GOOD_SIGNAL_MASK = 0x0F
+BAD_SIGNAL_MASK = 0xF0
+
+
 class SignalDetails(BaseModel):
     """Good/Badシグナル詳細（固定8項目 + 追加）"""
 
+    model_config = _HEMS_CONFIG
+
     # Good Signals（4項目）
     good_took_cost_action: Optional[bool] = Field(
         None, description="電気代削減のために過去に実際にお金/時間を使った"
@@ -250,10 +375,26 @@ class SignalDetails(BaseModel):
         None, description="各シグナルの根拠となる発言抜粋"
     )
 
+    @property
+    def signal_bits(self) -> int:
+        """固定8シグナルのうち True のものを SIGNAL_FIELDS の順でビットに詰めた値"""
+        return (
+            bool(self.good_took_cost_action)
+            | bool(self.good_uses_app_weekly) << 1
+            | bool(self.good_has_crowdfunding_exp) << 2
+            | bool(self.good_would_replace_immediately) << 3
+            | bool(self.bad_no_past_action) << 4
+            | bool(self.bad_no_bill_check_6months) << 5
+            | bool(self.bad_device_barely_used) << 6
+            | bool(self.bad_said_will_consider) << 7
+        )
+
 
 class Insights(BaseModel):
     """重要インサイト（v2: good/bad_signalsはSignalDetailsに移行）"""
 
+    model_config = _HEMS_CONFIG
+
     most_impressive_quote: Optional[str] = Field(
         None, description="最も印象的だった発言（原文）"
     )
@@ -268,7 +409,9 @@ class Insights(BaseModel):
 class CrowdfundingExperience(BaseModel):
     """クラウドファンディング経験"""
 
-    monthly_subscription_total: Optional[int] = Field(
+    model_config = _HEMS_CONFIG
+
+    monthly_subscription_total: Optional[YenAmount] = Field(
         None, description="月額サブスク総額（円）"
     )
     canceled_subscriptions: list[str] = Field(
@@ -277,8 +420,8 @@ class CrowdfundingExperience(BaseModel):
     has_crowdfunding_experience: Optional[bool] = Field(
         None, description="クラファン支援経験"
     )
-    crowdfunding_count: Optional[int] = Field(None, description="クラファン支援回数")
-    average_support_amount: Optional[int] = Field(
+    crowdfunding_count: Optional[SmallCount] = Field(None, description="クラファン支援回数")
+    average_support_amount: Optional[YenAmount] = Field(
         None, description="1回あたり平均支援額（円）"
     )
     supported_categories: list[str] = Field(
@@ -293,6 +436,8 @@ class CrowdfundingExperience(BaseModel):
 class FamilyAndBarriers(BaseModel):
     """家族利用と導入障壁"""
 
+    model_config = _HEMS_CONFIG
+
     family_usage: Optional[bool] = Field(None, description="家族利用状況")
     family_usage_frequency: Optional[str] = Field(None, description="家族の利用頻度")
     family_most_used_feature: Optional[str] = Field(
@@ -313,8 +458,10 @@ class FamilyAndBarriers(BaseModel):
 class HEMSInterviewData(BaseModel):
     """HEMS インタビューデータ（構造化出力のルートモデル）v2"""
 
+    model_config = _HEMS_CONFIG
+
     interview_id: Optional[str] = Field(None, description="インタビュー番号")
-    interview_duration_minutes: Optional[int] = Field(
+    interview_duration_minutes: Optional[SmallCount] = Field(
         None, description="インタビュー所要時間（分）"
     )
     basic_attributes: BasicAttributes = Field(default_factory=BasicAttributes)
@@ -330,3 +477,67 @@ class HEMSInterviewData(BaseModel):
     insights: Insights = Field(default_factory=Insights)
     summary: Optional[str] = Field(None, description="インタビュー全体の要約（3文以内）")
     action_items: list[str] = Field(default_factory=list, description="次のアクション項目")
+
+
+# =============================================================================
+# Transcript Input
+# =============================================================================
+
+
+class TranscriptSegment(BaseModel):
+    """文字起こし結果の1発話（aggregate_results の出力要素）"""
+
+    model_config = _HEMS_CONFIG
+
+    speaker: str
+    start: float
+    end: float
+    text: str
+
+
+# =============================================================================
+# Validation Entry Points
+# =============================================================================
+
+# モジュールロード時に1度だけ構築し、ウォーム起動間で再利用する
+HEMS_ADAPTER: TypeAdapter[HEMSInterviewData] = TypeAdapter(HEMSInterviewData)
+TRANSCRIPT_ADAPTER: TypeAdapter[list[TranscriptSegment]] = TypeAdapter(
+    list[TranscriptSegment]
+)
+# 複数件をまとめて取り込む場合はこちらを使う（要素ごとの Python 往復を避ける）
+BATCH_ADAPTER: TypeAdapter[list[HEMSInterviewData]] = TypeAdapter(list[HEMSInterviewData])
+
+
+def validate_interview(data: bytes | str | dict[str, Any]) -> HEMSInterviewData:
+    """
+    インタビューデータを検証して HEMSInterviewData を返す
+
+    bytes/str は pydantic-core で JSON パースと検証を1パスで行う。
+
+    Args:
+        data: JSON (bytes/str) またはデコード済みの dict
+
+    Returns:
+        HEMSInterviewData
+    """
+    if isinstance(data, (bytes, str)):
+        return HEMS_ADAPTER.validate_json(data)
+    return HEMS_ADAPTER.validate_python(data)
+
+
+def validate_batch(data: bytes | str | list[dict[str, Any]]) -> list[HEMSInterviewData]:
+    """
+    インタビューデータの配列を1回の呼び出しで検証する
+
+    複数件の取り込みでは validate_interview をループで呼ぶのではなく、
+    こちらでリスト全体を pydantic-core 内で処理する。
+
+    Args:
+        data: JSON 配列 (bytes/str) またはデコード済みの dict のリスト
+
+    Returns:
+        HEMSInterviewData のリスト（入力と同じ順序）
+    """
+    if isinstance(data, (bytes, str)):
+        return BATCH_ADAPTER.validate_json(data)
+    return BATCH_ADAPTER.validate_python(data)
@@ -0,0 +1,11 @@
+"""
+LLMAnalysis Lambda テスト用設定
+
+lambda_module フィクスチャは lambdas/conftest.py で定義。
+"""
+
+import sys
+from pathlib import Path
+
+# Lambda ディレクトリをパスに追加（テストから models / compute を直接インポートするため）
+sys.path.insert(0, str(Path(__file__).parent.parent))
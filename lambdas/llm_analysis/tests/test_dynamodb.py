@@ -5,71 +5,51 @@ DynamoDB 保存機能のテスト
 分析結果を DynamoDB に保存する機能のテスト。
 """
 
-import importlib.util
+import io
 import json
-import sys
 from collections.abc import Generator
-from pathlib import Path
+from types import ModuleType
 from unittest.mock import MagicMock, patch
 
 import pytest
+from models import HEMSInterviewData, Scoring
 
-# このLambdaのlambda_function.pyを動的にインポート
-LAMBDA_DIR = Path(__file__).parent.parent
-
-# Lambda ディレクトリをパスに追加（models モジュールを見つけるため）
-sys.path.insert(0, str(LAMBDA_DIR))
-
-spec = importlib.util.spec_from_file_location(
-    "llm_analysis_lambda", LAMBDA_DIR / "lambda_function.py"
-)
-if spec and spec.loader:
-    lambda_module = importlib.util.module_from_spec(spec)
-    sys.modules["llm_analysis_lambda"] = lambda_module
-    spec.loader.exec_module(lambda_module)
+# S3 上の文字起こし JSON（テストごとに再シリアライズしないよう事前にバイト列化）
+_TRANSCRIPT = [
+    {"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "こんにちは"},
+    {"speaker": "SPEAKER_01", "start": 5.5, "end": 10.0, "text": "電気代が高いです"},
+]
+_TRANSCRIPT_BYTES = json.dumps(_TRANSCRIPT).encode()
 
 
 class TestDynamoDBSave:
     """DynamoDB 保存機能のテスト"""
 
     @pytest.fixture
-    def mock_s3(self) -> Generator[MagicMock, None, None]:
+    def mock_s3(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """S3 クライアントのモック"""
         with patch.object(lambda_module, "s3") as mock:
-            mock.get_object.return_value = {
-                "Body": MagicMock(
-                    read=lambda: json.dumps(
-                        [
-                            {"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "こんにちは"},
-                            {"speaker": "SPEAKER_01", "start": 5.5, "end": 10.0, "text": "電気代が高いです"},
-                        ]
-                    ).encode()
-                )
-            }
+            mock.get_object.return_value = {"Body": io.BytesIO(_TRANSCRIPT_BYTES)}
             yield mock
 
     @pytest.fixture
-    def mock_dynamodb(self) -> Generator[MagicMock, None, None]:
+    def mock_dynamodb(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """DynamoDB クライアントのモック"""
         with patch.object(lambda_module, "dynamodb") as mock:
             mock.update_item.return_value = {}
             yield mock
 
     @pytest.fixture
-    def mock_openai_structured(self) -> Generator[MagicMock, None, None]:
+    def mock_openai_structured(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """OpenAI Structured Output のモック"""
         with patch.object(lambda_module, "get_openai_client") as mock:
             client = MagicMock()
 
             # Structured output のモック
-            parsed_data = MagicMock()
-            parsed_data.scoring = MagicMock()
-            parsed_data.scoring.total_score = 19
-            parsed_data.scoring.segment = "A"
-            parsed_data.model_dump_json.return_value = json.dumps({
-                "interview_id": "test-interview-001",
-                "scoring": {"total_score": 19, "segment": "A"},
-            })
+            parsed_data = HEMSInterviewData(
+                interview_id="test-interview-001",
+                scoring=Scoring(total_score=19, segment="A"),
+            )
 
             message = MagicMock()
             message.parsed = parsed_data
@@ -87,6 +67,7 @@ class TestDynamoDBSave:
 
     def test_save_to_dynamodb_after_structured_analysis(
         self,
+        lambda_module: ModuleType,
         mock_s3: MagicMock,
         mock_dynamodb: MagicMock,
         mock_openai_structured: MagicMock,
@@ -107,12 +88,20 @@ class TestDynamoDBSave:
             # DynamoDB update_item が呼ばれたことを確認
             mock_dynamodb.update_item.assert_called_once()
 
+            # S3 には UTF-8 JSON バイト列がそのまま保存されること
+            body = mock_s3.put_object.call_args.kwargs["Body"]
+            assert isinstance(body, bytes)
+            saved = json.loads(body.decode("utf-8"))
+            assert saved["interview_id"] == "test-interview-001"
+            assert saved["scoring"]["segment"] == "A"
+
             # 結果に interview_id が含まれること
             assert result["status"] == "completed"
             assert result["structured"] is True
 
     def test_dynamodb_update_contains_required_fields(
         self,
+        lambda_module: ModuleType,
         mock_s3: MagicMock,
         mock_dynamodb: MagicMock,
         mock_openai_structured: MagicMock,
@@ -147,6 +136,7 @@ class TestDynamoDBSave:
 
     def test_dynamodb_update_includes_s3_links(
         self,
+        lambda_module: ModuleType,
         mock_s3: MagicMock,
         mock_dynamodb: MagicMock,
         mock_openai_structured: MagicMock,
@@ -176,6 +166,7 @@ class TestDynamoDBSave:
 
     def test_no_dynamodb_save_when_table_not_configured(
         self,
+        lambda_module: ModuleType,
         mock_s3: MagicMock,
         mock_dynamodb: MagicMock,
         mock_openai_structured: MagicMock,
@@ -4,47 +4,34 @@ LLMAnalysis Lambda のテスト
 第5原則: テストファースト
 """
 
-import importlib.util
+import io
 import json
-import sys
 from collections.abc import Generator
-from pathlib import Path
+from types import ModuleType
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# このLambdaのlambda_function.pyを動的にインポート
-LAMBDA_DIR = Path(__file__).parent.parent
-spec = importlib.util.spec_from_file_location(
-    "llm_analysis_lambda", LAMBDA_DIR / "lambda_function.py"
-)
-if spec and spec.loader:
-    lambda_module = importlib.util.module_from_spec(spec)
-    sys.modules["llm_analysis_lambda"] = lambda_module
-    spec.loader.exec_module(lambda_module)
+# S3 上の文字起こし JSON（テストごとに再シリアライズしないよう事前にバイト列化）
+_TRANSCRIPT = [
+    {"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "こんにちは"},
+    {"speaker": "SPEAKER_01", "start": 5.5, "end": 10.0, "text": "はい、こんにちは"},
+]
+_TRANSCRIPT_BYTES = json.dumps(_TRANSCRIPT).encode()
 
 
 class TestLLMAnalysis:
     """LLM分析機能のテスト"""
 
     @pytest.fixture
-    def mock_s3(self) -> Generator[MagicMock, None, None]:
+    def mock_s3(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """S3 クライアントのモック"""
         with patch.object(lambda_module, "s3") as mock:
-            mock.get_object.return_value = {
-                "Body": MagicMock(
-                    read=lambda: json.dumps(
-                        [
-                            {"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "こんにちは"},
-                            {"speaker": "SPEAKER_01", "start": 5.5, "end": 10.0, "text": "はい、こんにちは"},
-                        ]
-                    ).encode()
-                )
-            }
+            mock.get_object.return_value = {"Body": io.BytesIO(_TRANSCRIPT_BYTES)}
             yield mock
 
     @pytest.fixture
-    def mock_openai(self) -> Generator[MagicMock, None, None]:
+    def mock_openai(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """OpenAI クライアントのモック"""
         with patch.object(lambda_module, "get_openai_client") as mock:
             client = MagicMock()
@@ -55,7 +42,7 @@ class TestLLMAnalysis:
             yield mock
 
     def test_lambda_handler_success(
-        self, mock_s3: MagicMock, mock_openai: MagicMock
+        self, lambda_module: ModuleType, mock_s3: MagicMock, mock_openai: MagicMock
     ) -> None:
         """正常系: LLM分析が成功すること"""
         event = {
@@ -70,7 +57,7 @@ class TestLLMAnalysis:
         assert "analysis_key" in result
 
     def test_lambda_handler_custom_prompt(
-        self, mock_s3: MagicMock, mock_openai: MagicMock
+        self, lambda_module: ModuleType, mock_s3: MagicMock, mock_openai: MagicMock
     ) -> None:
         """カスタムプロンプトが使用されること"""
         event = {
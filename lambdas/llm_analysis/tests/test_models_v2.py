@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
+from pydantic import ValidationError
 
 from models import (
     # Enums
@@ -22,18 +23,29 @@ from models import (
     PurchaseTiming,
     Segment,
     # Models
+    Scoring,
     PriceSensitivity,
     SignalDetails,
     ElectricityCost,
     DeviceInfo,
     CrowdfundingExperience,
     HEMSInterviewData,
+    # Validation
+    validate_interview,
+    validate_batch,
+    TRANSCRIPT_ADAPTER,
+    TranscriptSegment,
+    # Signal bit layout
+    SIGNAL_FIELDS,
 )
 from compute import (
+    ScoringConditions,
     compute_scoring_conditions,
     compute_scores_from_conditions,
     compute_judgment_label,
     compute_segment,
+    compute_good_signal_count,
+    compute_bad_signal_count,
 )
 
 
@@ -159,6 +171,33 @@ class TestSignalDetails:
         assert sd.evidence["good_took_cost_action"] == "LED電球を買った"
 
 
+class TestComputeSignalCounts:
+    """Test good/bad signal counting"""
+
+    def test_counts_true_signals_and_additional(self):
+        sd = SignalDetails(
+            good_took_cost_action=True,
+            good_uses_app_weekly=False,
+            good_has_crowdfunding_exp=None,
+            good_would_replace_immediately=True,
+            bad_no_past_action=True,
+            additional_good_signals=["売電収入を実感"],
+            additional_bad_signals=["初期費用を懸念", "設置場所がない"],
+        )
+        assert compute_good_signal_count(sd) == 3  # 2 fixed + 1 additional
+        assert compute_bad_signal_count(sd) == 3  # 1 fixed + 2 additional
+
+    def test_counts_empty_signals(self):
+        sd = SignalDetails()
+        assert compute_good_signal_count(sd) == 0
+        assert compute_bad_signal_count(sd) == 0
+
+    def test_signal_bits_follow_field_order(self):
+        for bit, name in enumerate(SIGNAL_FIELDS):
+            assert SignalDetails(**{name: True}).signal_bits == 1 << bit
+        assert "signal_bits" not in SignalDetails().model_dump()
+
+
 class TestComputeScoringConditions:
     """Test scoring condition computation from fact fields"""
 
@@ -224,20 +263,20 @@ class TestComputeScores:
     """Test score computation from conditions"""
 
     def test_compute_perfect_scores(self):
-        conditions = {
-            "can_recall_recent_bill": True,
-            "has_two_or_more_actions": True,
-            "has_switched_company": True,
-            "checks_bill_monthly": True,
-            "uses_app_weekly_3x": True,
-            "has_3_or_more_automations": True,
-            "has_5_or_more_devices": True,
-            "would_replace_immediately": True,
-            "has_crowdfunding_exp": True,
-            "crowdfunding_3_or_more": True,
-            "crowdfunding_10k_plus": True,
-            "crowdfunding_gadget": True,
-        }
+        conditions = ScoringConditions(
+            can_recall_recent_bill=True,
+            has_two_or_more_actions=True,
+            has_switched_company=True,
+            checks_bill_monthly=True,
+            uses_app_weekly_3x=True,
+            has_3_or_more_automations=True,
+            has_5_or_more_devices=True,
+            would_replace_immediately=True,
+            has_crowdfunding_exp=True,
+            crowdfunding_3_or_more=True,
+            crowdfunding_10k_plus=True,
+            crowdfunding_gadget=True,
+        )
         scores = compute_scores_from_conditions(conditions)
 
         assert scores["electricity_interest_score"] == 10
@@ -246,20 +285,20 @@ class TestComputeScores:
         assert scores["total_score"] == 30
 
     def test_compute_partial_scores(self):
-        conditions = {
-            "can_recall_recent_bill": True,  # +2
-            "has_two_or_more_actions": True,  # +3
-            "has_switched_company": False,  # +0
-            "checks_bill_monthly": False,  # +0
-            "uses_app_weekly_3x": False,  # +0
-            "has_3_or_more_automations": False,  # +0
-            "has_5_or_more_devices": False,  # +0
-            "would_replace_immediately": True,  # +3
-            "has_crowdfunding_exp": True,  # +3
-            "crowdfunding_3_or_more": False,  # +0
-            "crowdfunding_10k_plus": False,  # +0
-            "crowdfunding_gadget": False,  # +0
-        }
+        conditions = ScoringConditions(
+            can_recall_recent_bill=True,  # +2
+            has_two_or_more_actions=True,  # +3
+            has_switched_company=False,  # +0
+            checks_bill_monthly=False,  # +0
+            uses_app_weekly_3x=False,  # +0
+            has_3_or_more_automations=False,  # +0
+            has_5_or_more_devices=False,  # +0
+            would_replace_immediately=True,  # +3
+            has_crowdfunding_exp=True,  # +3
+            crowdfunding_3_or_more=False,  # +0
+            crowdfunding_10k_plus=False,  # +0
+            crowdfunding_gadget=False,  # +0
+        )
         scores = compute_scores_from_conditions(conditions)
 
         assert scores["electricity_interest_score"] == 5  # 2+3
@@ -268,20 +307,20 @@ class TestComputeScores:
         assert scores["total_score"] == 11
 
     def test_compute_zero_scores(self):
-        conditions = {
-            "can_recall_recent_bill": False,
-            "has_two_or_more_actions": False,
-            "has_switched_company": False,
-            "checks_bill_monthly": False,
-            "uses_app_weekly_3x": False,
-            "has_3_or_more_automations": False,
-            "has_5_or_more_devices": False,
-            "would_replace_immediately": False,
-            "has_crowdfunding_exp": False,
-            "crowdfunding_3_or_more": False,
-            "crowdfunding_10k_plus": False,
-            "crowdfunding_gadget": False,
-        }
+        conditions = ScoringConditions(
+            can_recall_recent_bill=False,
+            has_two_or_more_actions=False,
+            has_switched_company=False,
+            checks_bill_monthly=False,
+            uses_app_weekly_3x=False,
+            has_3_or_more_automations=False,
+            has_5_or_more_devices=False,
+            would_replace_immediately=False,
+            has_crowdfunding_exp=False,
+            crowdfunding_3_or_more=False,
+            crowdfunding_10k_plus=False,
+            crowdfunding_gadget=False,
+        )
         scores = compute_scores_from_conditions(conditions)
 
         assert scores["electricity_interest_score"] == 0
@@ -309,40 +348,44 @@ class TestComputeJudgmentLabel:
         assert compute_judgment_label(11) == "ターゲット外"
         assert compute_judgment_label(0) == "ターゲット外"
 
+    def test_out_of_range_scores_clamped(self):
+        assert compute_judgment_label(31) == "最優先ターゲット"
+        assert compute_judgment_label(-1) == "ターゲット外"
+
 
 class TestComputeSegment:
     """Test segment computation"""
 
     def test_segment_a_high_energy_awareness(self):
         """Segment A: electricity_interest >= 7 AND has_switched_company"""
-        conditions = {
-            "can_recall_recent_bill": True,
-            "has_two_or_more_actions": True,
-            "has_switched_company": True,
-            "checks_bill_monthly": True,  # score = 10
-        }
+        conditions = ScoringConditions(
+            can_recall_recent_bill=True,
+            has_two_or_more_actions=True,
+            has_switched_company=True,
+            checks_bill_monthly=True,  # score = 10
+        )
         scores = {"electricity_interest_score": 10}
         segment = compute_segment(conditions, scores)
         assert segment == Segment.A
 
     def test_segment_b_gadget_lover(self):
         """Segment B: has_crowdfunding_exp AND has_5_or_more_devices"""
-        conditions = {
-            "has_crowdfunding_exp": True,
-            "has_5_or_more_devices": True,
-            "has_switched_company": False,
-        }
+        conditions = ScoringConditions(
+            has_crowdfunding_exp=True,
+            has_5_or_more_devices=True,
+            has_switched_company=False,
+        )
         scores = {"electricity_interest_score": 4}
         segment = compute_segment(conditions, scores)
         assert segment == Segment.B
 
     def test_segment_c_convenience_seeker(self):
         """Segment C: engagement >= 7 AND electricity_interest <= 4"""
-        conditions = {
-            "has_crowdfunding_exp": False,
-            "has_5_or_more_devices": False,
-            "has_switched_company": False,
-        }
+        conditions = ScoringConditions(
+            has_crowdfunding_exp=False,
+            has_5_or_more_devices=False,
+            has_switched_company=False,
+        )
         scores = {
             "electricity_interest_score": 3,
             "engagement_score": 8,
@@ -352,13 +395,13 @@ class TestComputeSegment:
 
     def test_segment_d_light_user(self):
         """Segment D: app_monthly_or_less AND automation <= 1"""
-        conditions = {
-            "uses_app_weekly_3x": False,
-            "has_3_or_more_automations": False,
-            "has_crowdfunding_exp": False,
-            "has_5_or_more_devices": False,
-            "has_switched_company": False,
-        }
+        conditions = ScoringConditions(
+            uses_app_weekly_3x=False,
+            has_3_or_more_automations=False,
+            has_crowdfunding_exp=False,
+            has_5_or_more_devices=False,
+            has_switched_company=False,
+        )
         scores = {
             "electricity_interest_score": 3,
             "engagement_score": 2,
@@ -367,13 +410,135 @@ class TestComputeSegment:
         assert segment == Segment.D
 
 
+class TestValidateInterview:
+    """Test cached TypeAdapter validation entry point"""
+
+    def test_validate_from_json_bytes(self):
+        raw = b'{"interview_id": "001", "electricity_cost": {"recent_monthly_cost": 12000}}'
+        data = validate_interview(raw)
+        assert isinstance(data, HEMSInterviewData)
+        assert data.interview_id == "001"
+        assert data.electricity_cost.recent_monthly_cost == 12000
+
+    def test_validate_from_dict(self):
+        data = validate_interview({"device_info": {"automation_count": 3}})
+        assert data.device_info.automation_count == 3
+        assert data.signal_details.additional_good_signals == []
+
+    def test_nested_models_build_lazily(self):
+        data = validate_interview({"scoring": {"segment": "A"}})
+        assert data.scoring.segment == Segment.A
+        assert Scoring(total_score=10).total_score == 10
+
+    def test_amount_and_count_bounds(self):
+        assert ElectricityCost(recent_monthly_cost=10_000_000).recent_monthly_cost == 10_000_000
+        # 範囲外の値はエラーにせず不明（None）として扱う
+        assert ElectricityCost(recent_monthly_cost=-1).recent_monthly_cost is None
+        assert ElectricityCost(recent_monthly_cost=10_000_001).recent_monthly_cost is None
+        assert DeviceInfo(automation_count=100_001).automation_count is None
+        with pytest.raises(ValidationError):
+            DeviceInfo(automation_count="many")
+
+    def test_oversize_llm_amount_does_not_fail_analysis(self):
+        data = validate_interview(
+            {
+                "electricity_cost": {
+                    "recent_monthly_cost": 12_000,
+                    "summer_peak_cost": 120_000_000_000,
+                },
+                "scoring": {"total_score": 10},
+            }
+        )
+        assert data.electricity_cost.recent_monthly_cost == 12_000
+        assert data.electricity_cost.summer_peak_cost is None
+        assert data.scoring.total_score == 10
+
+    def test_amount_bounds_in_json_schema(self):
+        schema = ElectricityCost.model_json_schema()["properties"]["recent_monthly_cost"]
+        assert {"type": "integer", "minimum": 0, "maximum": 10_000_000} in schema["anyOf"]
+
+    def test_unknown_keys_ignored(self):
+        data = validate_interview({"scoring": {"total_score": 10, "legacy_note": "x"}})
+        assert not hasattr(data.scoring, "legacy_note")
+
+    def test_models_are_frozen(self):
+        data = validate_interview({"scoring": {"total_score": 10}})
+        with pytest.raises(ValidationError):
+            data.summary = "変更"
+        with pytest.raises(ValidationError):
+            data.scoring.total_score = 20
+
+    def test_validate_matches_model_dump_round_trip(self):
+        original = HEMSInterviewData(summary="要約", action_items=["フォロー"])
+        assert validate_interview(original.model_dump_json()) == original
+
+
+class TestValidateBatch:
+    """Test list validation through BATCH_ADAPTER"""
+
+    def test_validate_batch_json_preserves_order(self):
+        raw = b'[{"interview_id": "001"}, {"interview_id": "002", "scoring": {"segment": "B"}}]'
+        batch = validate_batch(raw)
+        assert [d.interview_id for d in batch] == ["001", "002"]
+        assert batch[1].scoring.segment is Segment.B
+
+    def test_validate_batch_python_matches_single(self):
+        items = [{"summary": "一件目"}, {"action_items": ["フォロー"]}]
+        assert validate_batch(items) == [validate_interview(d) for d in items]
+
+    def test_validate_batch_reports_element_errors(self):
+        with pytest.raises(ValidationError):
+            validate_batch([{}, {"electricity_cost": {"pain_score": 11}}])
+
+
+class TestTranscriptAdapter:
+    """Test transcript JSON parsing via TypeAdapter"""
+
+    def test_validate_json_bytes(self):
+        raw = (
+            '[{"speaker": "SPEAKER_00", "start": 0.0, "end": 5.0, "text": "こんにちは", '
+            '"language": "ja"}]'
+        ).encode()
+        transcript = TRANSCRIPT_ADAPTER.validate_json(raw)
+        assert transcript == [
+            TranscriptSegment(speaker="SPEAKER_00", start=0.0, end=5.0, text="こんにちは")
+        ]
+
+    def test_missing_text_rejected(self):
+        with pytest.raises(ValidationError):
+            TRANSCRIPT_ADAPTER.validate_json(b'[{"speaker": "SPEAKER_00", "start": 0, "end": 1}]')
+
+
 class TestModelBackwardCompatibility:
     """Test backward compatibility with existing data"""
 
     def test_old_string_bill_frequency_accepted(self):
         """Old string values should still work during transition"""
         ec = ElectricityCost(bill_check_frequency="毎月")
-        assert ec.bill_check_frequency == "毎月"
+        assert ec.bill_check_frequency is BillCheckFrequency.MONTHLY
+
+    def test_old_strings_resolve_to_enum_members(self):
+        """Legacy Japanese values map to enum members on every enum field"""
+        di = DeviceInfo(
+            purchase_channel="家電量販店",
+            app_usage_frequency="週数回",
+            replacement_intention="即買い直す",
+        )
+        assert di.purchase_channel is PurchaseChannel.ELECTRONICS_STORE
+        assert di.app_usage_frequency is AppUsageFrequency.WEEKLY_FEW
+        assert di.replacement_intention is ReplacementIntention.IMMEDIATE
+        assert Scoring(segment="B:ガジェット好き").segment is Segment.B
+
+    def test_unknown_string_rejected(self):
+        """Values outside the enum and legacy map fail validation"""
+        with pytest.raises(ValidationError):
+            ElectricityCost(bill_check_frequency="たまに")
+
+    def test_alias_does_not_leak_across_enums(self):
+        """A legacy alias only resolves on the enum it belongs to"""
+        assert AppUsageFrequency("ほぼ開かない") is AppUsageFrequency.RARELY
+        with pytest.raises(ValueError):
+            BillCheckFrequency("ほぼ開かない")
 
     def test_enum_bill_frequency_also_works(self):
         """New enum values should also work"""
@@ -9,15 +9,17 @@ MergeSpeakers Lambda Function
 Version: 1.0 - チャンク並列処理対応
 """
 
-import json
+import gzip
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 from typing import Any
 
 import boto3
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_similarity
+import orjson
+from botocore.config import Config
 
 from progress import update_progress
 
@@ -26,13 +28,38 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # S3 クライアント
-s3 = boto3.client("s3")
+# 並列 GET（最大 MAX_FETCH_WORKERS 本）がプール待ちにならないよう接続数を広げ、
+# ウォーム起動間で接続を使い回せるよう TCP keepalive を有効にする
+s3 = boto3.client(
+    "s3",
+    config=Config(
+        max_pool_connections=64,
+        tcp_keepalive=True,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+    ),
+)
 
 # 環境変数
 OUTPUT_BUCKET = os.environ.get("OUTPUT_BUCKET", "")
 
-# クラスタリングパラメータ（環境変数で上書き可能）
-SIMILARITY_THRESHOLD = float(os.environ.get("SIMILARITY_THRESHOLD", "0.75"))
+# S3 並列取得の最大スレッド数
+MAX_FETCH_WORKERS = 32
+
+# クラスタリングパラメータ（環境変数 SIMILARITY_THRESHOLD で上書き可能）
+DEFAULT_SIMILARITY_THRESHOLD = 0.75
+
+# この件数以下の埋め込みは linkage を使わず直接クラスタリングする
+SMALL_CLUSTER_MAX = 3
+
+# グローバルセグメントの1行（dict のリストではなく構造化配列で保持する）
+# 話者は文字列ではなく話者ラベル表のインデックスで持つ
+SEG_DTYPE = np.dtype([
+    ("global_start", np.float64),
+    ("global_end", np.float64),
+    ("effective_start", np.float64),
+    ("effective_end", np.float64),
+    ("speaker_id", np.int32),
+])
 
 
 def load_chunk_results(bucket: str, result_keys: list[str]) -> list[dict]:
@@ -46,12 +73,67 @@ def load_chunk_results(bucket: str, result_keys: list[str]) -> list[dict]:
     Returns:
         チャンク結果のリスト
     """
-    results = []
-    for key in result_keys:
+    if not result_keys:
+        return []
+
+    def fetch(key: str) -> dict:
         response = s3.get_object(Bucket=bucket, Key=key)
-        data = json.loads(response["Body"].read().decode("utf-8"))
-        results.append(data)
-    return results
+        return orjson.loads(response["Body"].read())
+
+    # GET はレイテンシ律速なので全件を並列に投げる（map で入力順を維持）
+    max_workers = min(MAX_FETCH_WORKERS, len(result_keys))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch, result_keys))
+
+
+def get_similarity_threshold() -> float:
+    """
+    話者を同一とみなすコサイン類似度の閾値を取得
+
+    インポート時に固定せず呼び出しごとに環境変数を読む（テストや調整時の上書きを反映する）
+
+    Returns:
+        類似度の閾値
+    """
+    value = os.environ.get("SIMILARITY_THRESHOLD")
+    return float(value) if value else DEFAULT_SIMILARITY_THRESHOLD
+
+
+def cluster_small(
+    condensed: np.ndarray, n: int, distance_threshold: float
+) -> list[int]:
+    """
+    3件以下の埋め込みを平均連結 AHC と同じ規則でクラスタリング
+
+    Args:
+        condensed: 上三角の距離ベクトル（scipy の condensed 形式、N <= 3）
+        n: 埋め込み数
+        distance_threshold: この距離未満のクラスタのみ結合する
+
+    Returns:
+        各埋め込みのクラスタラベル
+    """
+    labels = list(range(n))
+    if n < 2:
+        return labels
+
+    # condensed の並びは combinations(range(n), 2) と同じ
+    distances = dict(zip(combinations(range(n), 2), condensed.tolist(), strict=True))
+
+    # 最も近いペアを結合
+    nearest, (i, j) = min((d, pair) for pair, d in distances.items())
+    if nearest >= distance_threshold:
+        return labels
+    labels[j] = labels[i]
+
+    # 残り1件とは平均距離で判定
+    if n == 3:
+        k = 3 - i - j
+        d_ik = distances[min(i, k), max(i, k)]
+        d_jk = distances[min(j, k), max(j, k)]
+        if (d_ik + d_jk) / 2 < distance_threshold:
+            labels[k] = labels[i]
+    return labels
 
 
 def cluster_speakers(
@@ -67,44 +149,68 @@ def cluster_speakers(
         speaker_mapping: {chunk_idx_local_speaker: global_speaker}
         global_speaker_count: グローバル話者数
     """
-    # 全埋め込みを収集
-    all_embeddings = []
-    embedding_ids = []  # (chunk_index, local_speaker)
-    embedding_weights = []  # 重み（話者の総発話時間）
-
-    for result in chunk_results:
-        chunk_idx = result["chunk_index"]
-        for local_speaker, speaker_data in result.get("speakers", {}).items():
-            embedding = np.array(speaker_data["embedding"])
-            all_embeddings.append(embedding)
-            embedding_ids.append(f"chunk_{chunk_idx}_{local_speaker}")
-            embedding_weights.append(speaker_data.get("total_duration", 1.0))
-
-    if len(all_embeddings) == 0:
+    # 埋め込み数と次元を先に求め、(N, D) の float32 配列へ直接書き込む
+    # 話者埋め込みは float32 で学習・出力されるため float64 に広げない
+    speaker_entries = [
+        (result["chunk_index"], result.get("speakers", {})) for result in chunk_results
+    ]
+    n_embeddings = sum(len(speakers) for _, speakers in speaker_entries)
+
+    if n_embeddings == 0:
         logger.warning("No embeddings found")
         return {}, 0
 
-    if len(all_embeddings) == 1:
-        return {embedding_ids[0]: "SPEAKER_A"}, 1
+    if n_embeddings == 1:
+        chunk_idx, speakers = next((c, s) for c, s in speaker_entries if s)
+        return {f"chunk_{chunk_idx}_{next(iter(speakers))}": "SPEAKER_A"}, 1
 
-    all_embeddings = np.array(all_embeddings)
-    logger.info(f"Clustering {len(all_embeddings)} speaker embeddings")
-    logger.info(f"Using similarity threshold: {SIMILARITY_THRESHOLD}")
-
-    # コサイン類似度行列を計算
-    similarity_matrix = cosine_similarity(all_embeddings)
-
-    # 距離行列に変換 (1 - similarity)
-    distance_matrix = 1 - similarity_matrix
-
-    # Agglomerative Clustering
-    clustering = AgglomerativeClustering(
-        n_clusters=None,
-        distance_threshold=1 - SIMILARITY_THRESHOLD,
-        metric="precomputed",
-        linkage="average",
+    dim = next(
+        len(speaker_data["embedding"])
+        for _, speakers in speaker_entries
+        for speaker_data in speakers.values()
     )
-    labels = clustering.fit_predict(distance_matrix)
+    all_embeddings = np.empty((n_embeddings, dim), dtype=np.float32)
+    embedding_ids: list[str] = []  # chunk_{chunk_index}_{local_speaker}
+    for chunk_idx, speakers in speaker_entries:
+        for local_speaker, speaker_data in speakers.items():
+            all_embeddings[len(embedding_ids)] = speaker_data["embedding"]
+            embedding_ids.append(f"chunk_{chunk_idx}_{local_speaker}")
+
+    logger.info(f"Clustering {len(all_embeddings)} speaker embeddings")
+    similarity_threshold = get_similarity_threshold()
+    distance_threshold = 1.0 - similarity_threshold
+    logger.info(f"Using similarity threshold: {similarity_threshold}")
+
+    # コサイン類似度行列を計算（L2 正規化してから1回の行列積）
+    norms = np.linalg.norm(all_embeddings, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0  # ゼロベクトルは類似度0として扱う
+    np.divide(all_embeddings, norms, out=all_embeddings)
+    similarity_matrix = all_embeddings @ all_embeddings.T
+
+    # 上三角だけを取り出して condensed 距離ベクトル (1 - similarity) に変換
+    # 対称な N×N 距離行列は作らない（対角の自己距離も不要）
+    condensed = similarity_matrix[np.triu_indices(n_embeddings, k=1)]
+    del similarity_matrix
+    np.subtract(1.0, condensed, out=condensed)
+    # 丸め誤差による負の距離を除去
+    np.maximum(condensed, 0.0, out=condensed)
+
+    if n_embeddings <= SMALL_CLUSTER_MAX:
+        # 短いインタビューでよくある少人数のケースは linkage を経由しない
+        labels = cluster_small(condensed, n_embeddings, distance_threshold)
+    else:
+        # scipy は空チャンク・少人数の経路では不要なため、ここで初めて読み込む
+        from scipy.cluster.hierarchy import fcluster, linkage
+
+        # 平均連結の凝集型クラスタリング（scipy の C 実装）
+        # AgglomerativeClustering と同じく閾値「未満」の距離のみ結合するため、
+        # fcluster（閾値以下を結合）には閾値の直前の値を渡す
+        linkage_matrix = linkage(condensed, method="average")
+        labels = fcluster(
+            linkage_matrix,
+            t=np.nextafter(distance_threshold, 0.0),
+            criterion="distance",
+        )
 
     # クラスタラベルを SPEAKER_A, SPEAKER_B, ... に変換
     unique_labels = sorted(set(labels))
@@ -116,63 +222,146 @@ def cluster_speakers(
     # マッピングを作成
     speaker_mapping = {
         emb_id: label_to_speaker[label]
-        for emb_id, label in zip(embedding_ids, labels)
+        for emb_id, label in zip(embedding_ids, labels, strict=True)
     }
 
-    logger.info(f"Clustered into {len(unique_labels)} global speakers")
-    for emb_id, global_speaker in speaker_mapping.items():
-        logger.info(f"  {emb_id} -> {global_speaker}")
+    # マッピングは1行にまとめて出力（埋め込みごとの行出力はログ量が線形に増える）
+    logger.info(f"Clustered into {len(unique_labels)} global speakers: {speaker_mapping}")
 
     return speaker_mapping, len(unique_labels)
 
 
-def resolve_overlaps(
-    all_segments: list[dict],
-) -> list[dict]:
+def build_global_segments(
+    chunk_results: list[dict],
+) -> tuple[np.ndarray, list[tuple[str, str]], list[dict]]:
     """
-    オーバーラップ区間の重複を解決
-
-    戦略: effective_start/end の範囲内のセグメントのみを採用
+    チャンク結果を1回だけ走査し、グローバル時刻のセグメントとクラスタリング対象を集める
 
     Args:
-        all_segments: 全セグメント（effective_start/end 情報付き）
+        chunk_results: チャンク結果のリスト
 
     Returns:
-        解決済みセグメントのリスト
+        all_segments: SEG_DTYPE の構造化配列（speaker_id は local_speakers のインデックス）
+        local_speakers: (chunk_idx_local_speaker, local_speaker) のリスト
+        non_empty_chunks: セグメントを持つチャンク（話者クラスタリングの対象）
     """
-    resolved = []
+    chunk_segments = []
+    local_speakers: list[tuple[str, str]] = []
+    non_empty_chunks = []
 
-    for seg in all_segments:
-        seg_start = seg["global_start"]
-        seg_end = seg["global_end"]
-        effective_start = seg["effective_start"]
-        effective_end = seg["effective_end"]
+    for result in chunk_results:
+        segs = result.get("segments")
+        if not segs:
+            continue
+        non_empty_chunks.append(result)
+        chunk_idx = result["chunk_index"]
+        offset = result["offset"]
+        n = len(segs)
+        rows = np.empty(n, dtype=SEG_DTYPE)
+
+        # オフセット加算はチャンク単位でまとめてベクトル演算
+        local_starts = np.fromiter((seg["local_start"] for seg in segs), np.float64, count=n)
+        local_ends = np.fromiter((seg["local_end"] for seg in segs), np.float64, count=n)
+        rows["global_start"] = local_starts + offset
+        rows["global_end"] = local_ends + offset
+        rows["effective_start"] = result["effective_start"]
+        rows["effective_end"] = result["effective_end"]
+
+        # 話者はクラスタリング前なのでチャンク内のローカル話者の通し番号を書き込む
+        local_ids: dict[str, int] = {}
+        for seg in segs:
+            local_speaker = seg["local_speaker"]
+            if local_speaker not in local_ids:
+                local_ids[local_speaker] = len(local_speakers)
+                local_speakers.append((f"chunk_{chunk_idx}_{local_speaker}", local_speaker))
+        rows["speaker_id"] = np.fromiter(
+            (local_ids[seg["local_speaker"]] for seg in segs), np.int32, count=n
+        )
+        chunk_segments.append(rows)
+
+    all_segments = (
+        np.concatenate(chunk_segments) if chunk_segments else np.empty(0, dtype=SEG_DTYPE)
+    )
+    return all_segments, local_speakers, non_empty_chunks
 
-        # セグメントが有効範囲と重なる部分を計算
-        actual_start = max(seg_start, effective_start)
-        actual_end = min(seg_end, effective_end)
 
-        if actual_start < actual_end:
-            resolved.append({
-                "start": actual_start,
-                "end": actual_end,
-                "speaker": seg["speaker"],
-            })
+def assign_global_speakers(
+    all_segments: np.ndarray,
+    local_speakers: list[tuple[str, str]],
+    speaker_mapping: dict[str, str],
+) -> list[str]:
+    """
+    セグメントのローカル話者 ID をグローバル話者 ID に一括で付け替え
 
-    # 時刻順にソート
-    resolved.sort(key=lambda x: x["start"])
+    Args:
+        all_segments: build_global_segments の構造化配列（speaker_id を上書きする）
+        local_speakers: (chunk_idx_local_speaker, local_speaker) のリスト
+        speaker_mapping: {chunk_idx_local_speaker: global_speaker}
 
-    # 連続する同一話者セグメントを結合
-    merged = []
-    for seg in resolved:
-        if merged and merged[-1]["speaker"] == seg["speaker"]:
-            # 前のセグメントと近接している場合は結合（0.5秒以内）
-            if seg["start"] - merged[-1]["end"] < 0.5:
-                merged[-1]["end"] = seg["end"]
-                continue
-        merged.append(seg.copy())
+    Returns:
+        付け替え後の speaker_id に対応する話者ラベル
+    """
+    label_ids: dict[str, int] = {}
+    local_to_global = np.fromiter(
+        (
+            label_ids.setdefault(speaker_mapping.get(key, f"UNKNOWN_{local}"), len(label_ids))
+            for key, local in local_speakers
+        ),
+        np.int32,
+        count=len(local_speakers),
+    )
+    all_segments["speaker_id"] = local_to_global[all_segments["speaker_id"]]
+    return list(label_ids)
 
-    return merged
+
+def resolve_overlaps(
+    all_segments: np.ndarray,
+    speaker_labels: list[str],
+) -> list[dict]:
+    """
+    オーバーラップ区間の重複を解決
+
+    戦略: effective_start/end の範囲内のセグメントのみを採用
+
+    Args:
+        all_segments: 全セグメント（SEG_DTYPE の構造化配列）
+        speaker_labels: speaker_id に対応する話者ラベル
+
+    Returns:
+        解決済みセグメントのリスト
+    """
+    # セグメントが有効範囲と重なる部分を列単位で計算し、空になる区間を除外
+    actual_starts = np.maximum(all_segments["global_start"], all_segments["effective_start"])
+    actual_ends = np.minimum(all_segments["global_end"], all_segments["effective_end"])
+    keep = actual_starts < actual_ends
+    actual_starts = actual_starts[keep]
+    actual_ends = actual_ends[keep]
+    speaker_ids = all_segments["speaker_id"][keep]
+
+    # 時刻順にソート（安定ソートで同時刻は入力順を維持）
+    order = np.argsort(actual_starts, kind="stable")
+    starts = actual_starts[order]
+    ends = actual_ends[order]
+    speaker_ids = speaker_ids[order]
+    if len(starts) == 0:
+        return []
+
+    # 連続する同一話者セグメントを結合（ランレングスで一括処理）
+    # 話者が変わるか、直前のセグメントとの間隔が0.5秒以上なら新しいグループ
+    breaks = (speaker_ids[1:] != speaker_ids[:-1]) | (starts[1:] - ends[:-1] >= 0.5)
+    group_heads = np.flatnonzero(np.concatenate(([True], breaks)))
+    # 結合後の終了時刻はグループ最後のセグメントの終了時刻
+    group_tails = np.append(group_heads[1:] - 1, len(starts) - 1)
+
+    return [
+        {"start": start, "end": end, "speaker": speaker_labels[speaker_id]}
+        for start, end, speaker_id in zip(
+            starts[group_heads].tolist(),
+            ends[group_tails].tolist(),
+            speaker_ids[group_heads].tolist(),
+            strict=True,
+        )
+    ]
 
 
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
@@ -214,8 +403,8 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     result_keys = [r["result_key"] for r in chunk_results_meta]
     chunk_results = load_chunk_results(bucket, result_keys)
 
-    # 空のチャンク（セグメントなし）をフィルタリング
-    non_empty_chunks = [r for r in chunk_results if r.get("segments")]
+    # チャンク結果を1回だけ走査し、セグメントと話者クラスタリング対象（空でないチャンク）を集める
+    all_segments, local_speakers, non_empty_chunks = build_global_segments(chunk_results)
     if not non_empty_chunks:
         logger.warning("All chunks are empty (no segments)")
         # Step Functionsにはメタデータのみ返す（ペイロード削減）
@@ -233,31 +422,12 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     logger.info("Clustering speakers across chunks...")
     speaker_mapping, global_speaker_count = cluster_speakers(non_empty_chunks)
 
-    # グローバルセグメントを構築
-    all_segments = []
-
-    for result in chunk_results:
-        chunk_idx = result["chunk_index"]
-        offset = result["offset"]
-        effective_start = result["effective_start"]
-        effective_end = result["effective_end"]
-
-        for seg in result.get("segments", []):
-            local_speaker = seg["local_speaker"]
-            mapping_key = f"chunk_{chunk_idx}_{local_speaker}"
-            global_speaker = speaker_mapping.get(mapping_key, f"UNKNOWN_{local_speaker}")
-
-            all_segments.append({
-                "global_start": seg["local_start"] + offset,
-                "global_end": seg["local_end"] + offset,
-                "speaker": global_speaker,
-                "effective_start": effective_start,
-                "effective_end": effective_end,
-            })
+    # ローカル話者をグローバル話者に付け替え
+    speaker_labels = assign_global_speakers(all_segments, local_speakers, speaker_mapping)
 
     # オーバーラップ解決
     logger.info("Resolving overlaps...")
-    final_segments = resolve_overlaps(all_segments)
+    final_segments = resolve_overlaps(all_segments, speaker_labels)
     logger.info(f"Final segment count: {len(final_segments)}")
 
     # 出力バケットを決定
@@ -265,13 +435,16 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
     # セグメント情報を S3 に保存
     base_key = audio_key.rsplit(".", 1)[0] if "." in audio_key else audio_key
-    segments_key = f"{base_key}_segments.json"
+    segments_key = f"{base_key}_segments.json.gz"
 
+    # キー名が繰り返される JSON のため gzip で数分の一に圧縮して保存
+    body = gzip.compress(orjson.dumps(final_segments), compresslevel=6)
     s3.put_object(
         Bucket=output_bucket,
         Key=segments_key,
-        Body=json.dumps(final_segments, ensure_ascii=False),
+        Body=body,
         ContentType="application/json",
+        ContentEncoding="gzip",
     )
 
     # Step Functionsにはメタデータのみ返す（ペイロード削減）
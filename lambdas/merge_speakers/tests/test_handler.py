@@ -5,6 +5,7 @@ MergeSpeakers Lambda のテスト
 チャンク並列処理対応版
 """
 
+import gzip
 import importlib.util
 import json
 import sys
@@ -32,6 +33,47 @@ if spec and spec.loader:
     spec.loader.exec_module(lambda_module)
 
 
+def _segment_array(segments: list[dict]) -> tuple[np.ndarray, list[str]]:
+    """dict のセグメントリストを SEG_DTYPE の構造化配列と話者ラベルに変換"""
+    speaker_ids: dict[str, int] = {}
+    rows = [
+        (
+            seg["global_start"],
+            seg["global_end"],
+            seg["effective_start"],
+            seg["effective_end"],
+            speaker_ids.setdefault(seg["speaker"], len(speaker_ids)),
+        )
+        for seg in segments
+    ]
+    return np.array(rows, dtype=lambda_module.SEG_DTYPE), list(speaker_ids)
+
+
+class TestLoadChunkResults:
+    """チャンク結果読み込みのテスト"""
+
+    def test_results_keep_key_order(self) -> None:
+        """並列取得しても入力キーの順序で返す"""
+        keys = [f"diarization/chunk_{i:02d}.json" for i in range(5)]
+
+        def get_object(Bucket: str, Key: str) -> dict:
+            body = json.dumps({"key": Key}).encode()
+            return {"Body": MagicMock(read=MagicMock(return_value=body))}
+
+        with patch.object(lambda_module, "s3") as mock_s3:
+            mock_s3.get_object.side_effect = get_object
+            results = lambda_module.load_chunk_results("test-bucket", keys)
+
+        assert [r["key"] for r in results] == keys
+        assert mock_s3.get_object.call_count == 5
+
+    def test_empty_keys(self) -> None:
+        """キーが空なら S3 を呼ばない"""
+        with patch.object(lambda_module, "s3") as mock_s3:
+            assert lambda_module.load_chunk_results("test-bucket", []) == []
+            mock_s3.get_object.assert_not_called()
+
+
 class TestClusterSpeakers:
     """話者クラスタリングのテスト"""
 
@@ -94,6 +136,52 @@ class TestClusterSpeakers:
         assert count == 2
         assert mapping["chunk_0_SPEAKER_00"] != mapping["chunk_0_SPEAKER_01"]
 
+    def test_many_embeddings_use_linkage(self) -> None:
+        """4件以上の埋め込みも平均連結で話者ごとにまとまる"""
+        embedding1 = np.random.randn(512)
+        embedding2 = -embedding1
+        chunk_results = [
+            {
+                "chunk_index": chunk_idx,
+                "speakers": {
+                    "SPEAKER_00": {
+                        "embedding": (embedding1 + np.random.normal(0, 0.01, 512)).tolist(),
+                        "total_duration": 30.0,
+                    },
+                    "SPEAKER_01": {
+                        "embedding": (embedding2 + np.random.normal(0, 0.01, 512)).tolist(),
+                        "total_duration": 25.0,
+                    },
+                },
+            }
+            for chunk_idx in range(3)
+        ]
+
+        mapping, count = lambda_module.cluster_speakers(chunk_results)
+
+        assert count == 2
+        assert len({mapping[f"chunk_{i}_SPEAKER_00"] for i in range(3)}) == 1
+        assert mapping["chunk_0_SPEAKER_00"] != mapping["chunk_0_SPEAKER_01"]
+
+    def test_threshold_read_from_env_per_call(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """インポート後に変更した SIMILARITY_THRESHOLD が反映される"""
+        # コサイン類似度 0.5 の2埋め込み
+        chunk_results = [
+            {
+                "chunk_index": 0,
+                "speakers": {
+                    "SPEAKER_00": {"embedding": [1.0, 0.0], "total_duration": 30.0},
+                    "SPEAKER_01": {"embedding": [0.5, 0.75**0.5], "total_duration": 25.0},
+                },
+            },
+        ]
+
+        monkeypatch.setenv("SIMILARITY_THRESHOLD", "0.75")
+        assert lambda_module.cluster_speakers(chunk_results)[1] == 2
+
+        monkeypatch.setenv("SIMILARITY_THRESHOLD", "0.4")
+        assert lambda_module.cluster_speakers(chunk_results)[1] == 1
+
     def test_empty_chunk_results(self) -> None:
         """空のチャンク結果を処理"""
         mapping, count = lambda_module.cluster_speakers([])
@@ -121,6 +209,99 @@ class TestClusterSpeakers:
         assert mapping["chunk_0_SPEAKER_00"] == "SPEAKER_A"
 
 
+class TestClusterSmall:
+    """少数埋め込みの高速パスのテスト"""
+
+    def test_three_embeddings_two_speakers(self) -> None:
+        """2件が近く1件が遠い場合は2クラスタ"""
+        # (0,1), (0,2), (1,2) の順の condensed 距離
+        condensed = np.array([0.1, 0.9, 0.95], dtype=np.float32)
+
+        labels = lambda_module.cluster_small(condensed, 3, 0.25)
+
+        assert labels[0] == labels[1]
+        assert labels[2] != labels[0]
+
+    def test_third_joins_by_average_distance(self) -> None:
+        """3件目は結合済みクラスタとの平均距離が閾値未満なら結合"""
+        condensed = np.array([0.1, 0.2, 0.28], dtype=np.float32)
+
+        assert len(set(lambda_module.cluster_small(condensed, 3, 0.25))) == 1
+
+    def test_all_far_apart(self) -> None:
+        """全ペアが閾値以上なら全て別クラスタ"""
+        condensed = np.array([0.5], dtype=np.float32)
+
+        assert lambda_module.cluster_small(condensed, 2, 0.25) == [0, 1]
+
+
+class TestBuildGlobalSegments:
+    """グローバルセグメント構築のテスト"""
+
+    def test_offset_and_speaker_mapping(self) -> None:
+        """オフセット加算と話者マッピングが行単位で適用され、空チャンクは除外される"""
+        chunk_results = [
+            {
+                "chunk_index": 0,
+                "offset": 0.0,
+                "effective_start": 0.0,
+                "effective_end": 465.0,
+                "segments": [],
+            },
+            {
+                "chunk_index": 1,
+                "offset": 450.0,
+                "effective_start": 465.0,
+                "effective_end": 930.0,
+                "segments": [
+                    {"local_start": 1.0, "local_end": 2.0, "local_speaker": "SPEAKER_00"},
+                    {"local_start": 3.0, "local_end": 4.0, "local_speaker": "SPEAKER_01"},
+                ],
+            },
+        ]
+
+        segments, local_speakers, non_empty_chunks = lambda_module.build_global_segments(
+            chunk_results
+        )
+
+        assert segments["global_start"].tolist() == [451.0, 453.0]
+        assert segments["global_end"].tolist() == [452.0, 454.0]
+        assert segments["effective_start"].tolist() == [465.0, 465.0]
+        assert non_empty_chunks == [chunk_results[1]]
+
+        speaker_labels = lambda_module.assign_global_speakers(
+            segments, local_speakers, {"chunk_1_SPEAKER_00": "SPEAKER_A"}
+        )
+
+        assert segments["speaker_id"].tolist() == [0, 1]
+        assert speaker_labels == ["SPEAKER_A", "UNKNOWN_SPEAKER_01"]
+
+    def test_same_global_speaker_shares_id(self) -> None:
+        """別チャンクの同一話者は同じ speaker_id に付け替えられる"""
+        chunk_results = [
+            {
+                "chunk_index": chunk_idx,
+                "offset": chunk_idx * 450.0,
+                "effective_start": chunk_idx * 465.0,
+                "effective_end": (chunk_idx + 1) * 465.0,
+                "segments": [
+                    {"local_start": 1.0, "local_end": 2.0, "local_speaker": "SPEAKER_00"},
+                ],
+            }
+            for chunk_idx in range(2)
+        ]
+        segments, local_speakers, _ = lambda_module.build_global_segments(chunk_results)
+
+        speaker_labels = lambda_module.assign_global_speakers(
+            segments,
+            local_speakers,
+            {"chunk_0_SPEAKER_00": "SPEAKER_A", "chunk_1_SPEAKER_00": "SPEAKER_A"},
+        )
+
+        assert segments["speaker_id"].tolist() == [0, 0]
+        assert speaker_labels == ["SPEAKER_A"]
+
+
 class TestResolveOverlaps:
     """オーバーラップ解決のテスト"""
 
@@ -136,7 +317,7 @@ class TestResolveOverlaps:
             },
         ]
 
-        result = lambda_module.resolve_overlaps(segments)
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
 
         assert len(result) == 1
         assert result[0]["start"] == 10.0
@@ -154,7 +335,7 @@ class TestResolveOverlaps:
             },
         ]
 
-        result = lambda_module.resolve_overlaps(segments)
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
 
         assert len(result) == 1
         assert result[0]["start"] == 470.0
@@ -172,7 +353,7 @@ class TestResolveOverlaps:
             },
         ]
 
-        result = lambda_module.resolve_overlaps(segments)
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
 
         assert len(result) == 0
 
@@ -195,7 +376,7 @@ class TestResolveOverlaps:
             },
         ]
 
-        result = lambda_module.resolve_overlaps(segments)
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
 
         assert len(result) == 1
         assert result[0]["start"] == 10.0
@@ -220,7 +401,7 @@ class TestResolveOverlaps:
             },
         ]
 
-        result = lambda_module.resolve_overlaps(segments)
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
 
         assert len(result) == 2
 
@@ -243,11 +424,32 @@ class TestResolveOverlaps:
             },
         ]
 
-        result = lambda_module.resolve_overlaps(segments)
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
 
         assert result[0]["start"] == 10.0
         assert result[1]["start"] == 100.0
 
+    def test_equal_starts_keep_input_order(self) -> None:
+        """開始時刻が同じセグメントは入力順を維持する（安定ソート）"""
+        segments = [
+            {
+                "global_start": 10.0,
+                "global_end": 12.0,
+                "speaker": speaker,
+                "effective_start": 0.0,
+                "effective_end": 480.0,
+            }
+            for speaker in ("SPEAKER_B", "SPEAKER_A")
+        ]
+
+        result = lambda_module.resolve_overlaps(*_segment_array(segments))
+
+        assert [seg["speaker"] for seg in result] == ["SPEAKER_B", "SPEAKER_A"]
+
+    def test_empty_segments(self) -> None:
+        """セグメントがなければ空リスト"""
+        assert lambda_module.resolve_overlaps(*_segment_array([])) == []
+
 
 class TestLambdaHandler:
     """Lambda ハンドラーのテスト
@@ -354,7 +556,9 @@ class TestLambdaHandler:
         mock_s3.put_object.assert_called_once()
         call_kwargs = mock_s3.put_object.call_args.kwargs
         assert "segments" in call_kwargs["Key"]
+        assert call_kwargs["Key"].endswith(".json.gz")
         assert call_kwargs["ContentType"] == "application/json"
+        assert call_kwargs["ContentEncoding"] == "gzip"
 
     def test_lambda_handler_missing_bucket(self) -> None:
         """bucket が指定されていない場合にエラー"""
@@ -440,7 +644,8 @@ class TestGlobalTimestampConversion:
             # segmentsはS3に保存されるため、put_objectで検証
             mock_s3.put_object.assert_called_once()
             call_kwargs = mock_s3.put_object.call_args.kwargs
-            saved_segments = json.loads(call_kwargs["Body"])
+            assert call_kwargs["ContentEncoding"] == "gzip"
+            saved_segments = json.loads(gzip.decompress(call_kwargs["Body"]))
 
             # ローカルタイムスタンプ 35.0〜45.0 + オフセット 450.0 = 485.0〜495.0
             assert saved_segments[0]["start"] == 485.0
@@ -7,13 +7,14 @@ subprocess で ffmpeg を直接呼び出し（外部ライブラリ依存なし
 Version: 2.0 - Python 3.12 compatible
 """
 
-import json
+import gzip
 import logging
 import os
 import subprocess
 from typing import Any
 
 import boto3
+import orjson
 
 from progress import update_progress
 
@@ -27,18 +28,25 @@ s3 = boto3.client("s3")
 # 環境変数
 OUTPUT_BUCKET = os.environ.get("OUTPUT_BUCKET", "")
 
+# 1回の ffmpeg 呼び出しで切り出す最大セグメント数（同時に開く出力ファイル数を抑える）
+MAX_OUTPUTS_PER_FFMPEG = 100
 
-def split_audio(
-    input_path: str, output_path: str, start_sec: float, duration_sec: float
-) -> None:
+# Transcribe Lambda 1回の呼び出しに渡すバッチの上限（TranscribeSegments Map state 用）
+# 処理時間は件数ではなく音声長に比例するため、合計秒数で区切る。
+# medium / int8 の CPU 推論はおおむね実時間程度で、約 12 分までなら Lambda 上限の 15 分に
+# 収まるため、モデル読み込みやダウンロードの分を見込んで 5 分とする
+# 変更する場合は Transcribe Lambda のタイムアウト（lambda-stack.ts）も見直す
+TRANSCRIBE_BATCH_MAX_SECONDS = 300.0
+TRANSCRIBE_BATCH_MAX_SEGMENTS = 10
+
+
+def split_all_audio(input_path: str, cuts: list[tuple[str, float, float]]) -> None:
     """
-    音声ファイルから指定区間を切り出す
+    音声ファイルから複数区間を1回の ffmpeg 呼び出しでまとめて切り出す
 
     Args:
         input_path: 入力音声ファイルのパス
-        output_path: 出力音声ファイルのパス
-        start_sec: 開始時間（秒）
-        duration_sec: 長さ（秒）
+        cuts: (出力音声ファイルのパス, 開始時間（秒）, 長さ（秒）) のリスト
 
     Raises:
         FileNotFoundError: 入力ファイルが存在しない場合
@@ -46,18 +54,23 @@ def split_audio(
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
-
-    cmd = [
-        "ffmpeg",
-        "-ss", str(start_sec),
-        "-t", str(duration_sec),
-        "-i", input_path,
-        "-acodec", "pcm_s16le",
-        "-ar", "16000",
-        "-ac", "1",
-        "-y",
-        output_path,
-    ]
+    if not cuts:
+        return
+
+    # 入力側で -ss/-t を指定して各区間へ直接シークする（区間外はデコードしない）
+    # ストリームコピーでは切り出し位置がパケット境界に丸められるため、デコードして
+    # サンプル単位で切り出し、Whisper 用に 16kHz モノラル PCM へ正規化して出力する
+    cmd = ["ffmpeg", "-y"]
+    for _, start_sec, duration_sec in cuts:
+        cmd += ["-ss", str(start_sec), "-t", str(duration_sec), "-i", input_path]
+    for input_index, (output_path, _, _) in enumerate(cuts):
+        cmd += [
+            "-map", f"{input_index}:a",
+            "-acodec", "pcm_s16le",
+            "-ar", "16000",
+            "-ac", "1",
+            output_path,
+        ]
 
     result = subprocess.run(cmd, capture_output=True, text=True)
 
@@ -66,6 +79,37 @@ def split_audio(
         raise RuntimeError(f"ffmpeg error: {result.stderr}")
 
 
+def batch_segment_files(segment_files: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    """
+    セグメントを合計音声長と件数の上限で Transcribe 用のバッチに分ける
+
+    1件で TRANSCRIBE_BATCH_MAX_SECONDS を超えるセグメントは単独のバッチにする
+
+    Args:
+        segment_files: セグメントファイル情報のリスト（start / end を含む）
+
+    Returns:
+        バッチ（セグメントファイル情報のリスト）のリスト
+    """
+    batches: list[list[dict[str, Any]]] = []
+    batch: list[dict[str, Any]] = []
+    batch_seconds = 0.0
+    for segment_file in segment_files:
+        duration = segment_file["end"] - segment_file["start"]
+        if batch and (
+            batch_seconds + duration > TRANSCRIBE_BATCH_MAX_SECONDS
+            or len(batch) >= TRANSCRIBE_BATCH_MAX_SEGMENTS
+        ):
+            batches.append(batch)
+            batch = []
+            batch_seconds = 0.0
+        batch.append(segment_file)
+        batch_seconds += duration
+    if batch:
+        batches.append(batch)
+    return batches
+
+
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Lambda ハンドラー
@@ -80,6 +124,7 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     Returns:
         処理結果（ペイロード削減のためメタデータのみ）
             - bucket: 出力バケット名
+            - segment_batches: Transcribe 用のバッチ（TranscribeSegments Map state 用）
             - segment_files_key: セグメントファイル情報のS3キー
             - segment_count: セグメント数
             - audio_key: 元の音声ファイルのキー
@@ -107,7 +152,11 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         # セグメント情報を取得
         logger.info(f"Getting segments from s3://{bucket}/{segments_key}")
         response = s3.get_object(Bucket=bucket, Key=segments_key)
-        segments = json.loads(response["Body"].read().decode("utf-8"))
+        body = response["Body"].read()
+        # merge_speakers は gzip 圧縮して保存する（diarize 単体の出力は非圧縮）
+        if response.get("ContentEncoding") == "gzip":
+            body = gzip.decompress(body)
+        segments = orjson.loads(body)
 
         logger.info(f"Processing {len(segments)} segments")
 
@@ -118,34 +167,44 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         base_key = audio_key.rsplit("/", 1)[-1].rsplit(".", 1)[0]
 
         segment_files = []
-        for i, seg in enumerate(segments):
-            start_sec = seg["start"]
-            end_sec = seg["end"]
-            duration_sec = end_sec - start_sec
-            speaker = seg["speaker"]
-
-            # ローカルパスを生成
-            local_path = f"{local_segment_prefix}{i:04d}.wav"
-
-            # セグメントを切り出し
-            split_audio(local_audio, local_path, start_sec, duration_sec)
-
-            # S3 にアップロード
-            segment_key = f"segments/{base_key}_{i:04d}_{speaker}.wav"
-            s3.upload_file(local_path, output_bucket, segment_key)
-
-            segment_files.append(
-                {
-                    "key": segment_key,
-                    "speaker": speaker,
-                    "start": seg["start"],
-                    "end": seg["end"],
-                }
+        # セグメントごとに ffmpeg を起動せず、バッチ単位で1プロセスにまとめて切り出す
+        for batch_start in range(0, len(segments), MAX_OUTPUTS_PER_FFMPEG):
+            batch = segments[batch_start : batch_start + MAX_OUTPUTS_PER_FFMPEG]
+            local_paths = [
+                f"{local_segment_prefix}{i:04d}.wav"
+                for i in range(batch_start, batch_start + len(batch))
+            ]
+            split_all_audio(
+                local_audio,
+                [
+                    (local_path, seg["start"], seg["end"] - seg["start"])
+                    for local_path, seg in zip(local_paths, batch, strict=True)
+                ],
             )
 
-            # ローカルファイルを削除
-            if os.path.exists(local_path):
-                os.remove(local_path)
+            for i, (local_path, seg) in enumerate(
+                zip(local_paths, batch, strict=True), start=batch_start
+            ):
+                speaker = seg["speaker"]
+
+                # S3 にアップロード
+                segment_key = f"segments/{base_key}_{i:04d}_{speaker}.wav"
+                s3.upload_file(local_path, output_bucket, segment_key)
+
+                segment_files.append(
+                    {
+                        "key": segment_key,
+                        "speaker": speaker,
+                        "start": seg["start"],
+                        "end": seg["end"],
+                    }
+                )
+
+                # ローカルファイルを削除
+                try:
+                    os.remove(local_path)
+                except FileNotFoundError:
+                    pass
 
         logger.info(f"Created {len(segment_files)} segment files")
 
@@ -155,14 +214,14 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         s3.put_object(
             Bucket=output_bucket,
             Key=segment_files_key,
-            Body=json.dumps(segment_files, ensure_ascii=False),
+            Body=orjson.dumps(segment_files),
             ContentType="application/json",
         )
 
         # Step Functionsに返す（segment_filesは約100バイト/セグメントで256KB未満）
         result = {
             "bucket": output_bucket,
-            "segment_files": segment_files,  # Map state用
+            "segment_batches": batch_segment_files(segment_files),  # Map state用
             "segment_files_key": segment_files_key,  # AggregateResults用（S3から読み込み）
             "segment_count": len(segment_files),
             "audio_key": audio_key,
@@ -174,5 +233,7 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
 
     finally:
         # 一時ファイルをクリーンアップ
-        if os.path.exists(local_audio):
+        try:
             os.remove(local_audio)
+        except FileNotFoundError:
+            pass
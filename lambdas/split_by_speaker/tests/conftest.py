@@ -0,0 +1,14 @@
+"""
+SplitBySpeaker Lambda テスト用設定
+
+lambda_module フィクスチャは lambdas/conftest.py で定義。
+"""
+
+import sys
+from types import ModuleType
+from unittest.mock import MagicMock
+
+# progress モジュールのモック（Lambda 実行環境でのみ存在）
+mock_progress = ModuleType("progress")
+mock_progress.update_progress = MagicMock()  # type: ignore
+sys.modules["progress"] = mock_progress
@@ -5,12 +5,12 @@ SplitBySpeaker Lambda のテスト
 
 修正: States.DataLimitExceeded対策
 - segment_filesをS3に保存（AggregateResults用）
-- segment_filesも返す（TranscribeSegments Map state用、約100バイト/セグメントで256KB未満）
+- segment_filesを音声長で区切ったバッチで返す
+  （TranscribeSegments Map state用、約100バイト/セグメントで256KB未満）
 """
 
-import importlib.util
+import gzip
 import json
-import sys
 from collections.abc import Generator
 from pathlib import Path
 from types import ModuleType
@@ -18,27 +18,12 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-# progress モジュールのモック（Lambda 実行環境でのみ存在）
-mock_progress = ModuleType("progress")
-mock_progress.update_progress = MagicMock()  # type: ignore
-sys.modules["progress"] = mock_progress
-
-# このLambdaのlambda_function.pyを動的にインポート
-LAMBDA_DIR = Path(__file__).parent.parent
-spec = importlib.util.spec_from_file_location(
-    "split_by_speaker_lambda", LAMBDA_DIR / "lambda_function.py"
-)
-if spec and spec.loader:
-    lambda_module = importlib.util.module_from_spec(spec)
-    sys.modules["split_by_speaker_lambda"] = lambda_module
-    spec.loader.exec_module(lambda_module)
-
 
 class TestSplitBySpeaker:
     """音声分割機能のテスト"""
 
     @pytest.fixture
-    def mock_s3(self) -> Generator[MagicMock, None, None]:
+    def mock_s3(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """S3 クライアントのモック"""
         with patch.object(lambda_module, "s3") as mock:
             # segments.json のモックデータ
@@ -55,7 +40,7 @@ class TestSplitBySpeaker:
             yield mock
 
     @pytest.fixture
-    def mock_subprocess(self) -> Generator[MagicMock, None, None]:
+    def mock_subprocess(self, lambda_module: ModuleType) -> Generator[MagicMock, None, None]:
         """subprocess.run のモック"""
         with patch.object(lambda_module.subprocess, "run") as mock:
             # 成功を返すモック
@@ -63,14 +48,18 @@ class TestSplitBySpeaker:
             yield mock
 
     @pytest.fixture
-    def mock_os(self) -> Generator[None, None, None]:
+    def mock_os(self, lambda_module: ModuleType) -> Generator[None, None, None]:
         """os.path.exists と os.remove のモック"""
         with patch.object(lambda_module.os.path, "exists", return_value=True):
             with patch.object(lambda_module.os, "remove"):
                 yield None
 
     def test_lambda_handler_success(
-        self, mock_s3: MagicMock, mock_subprocess: MagicMock, mock_os: None
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_os: None,
     ) -> None:
         """正常系: 音声分割が成功し、segment_filesがS3に保存されること"""
         event = {
@@ -87,12 +76,15 @@ class TestSplitBySpeaker:
         assert "segment_files_key" in result
         assert result["segment_files_key"].endswith("_segment_files.json")
         assert result["segment_count"] == 2
-        # segment_filesも返される（Map state用）
-        assert "segment_files" in result
-        assert len(result["segment_files"]) == 2
+        # バッチ化した segment_files も返される（Map state用）
+        assert [len(batch) for batch in result["segment_batches"]] == [2]
 
     def test_lambda_handler_saves_segment_files_to_s3(
-        self, mock_s3: MagicMock, mock_subprocess: MagicMock, mock_os: None
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_os: None,
     ) -> None:
         """segment_filesがS3に正しく保存されること"""
         event = {
@@ -115,7 +107,11 @@ class TestSplitBySpeaker:
         assert saved_data[0]["speaker"] == "SPEAKER_00"
 
     def test_lambda_handler_empty_segments(
-        self, mock_s3: MagicMock, mock_subprocess: MagicMock, mock_os: None
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_os: None,
     ) -> None:
         """空のセグメントリストでも正常に動作すること"""
         mock_s3.get_object.return_value = {
@@ -133,8 +129,38 @@ class TestSplitBySpeaker:
 
         assert result["segment_count"] == 0
 
+    def test_lambda_handler_gzip_segments(
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_os: None,
+    ) -> None:
+        """merge_speakers が保存した gzip 圧縮のセグメント情報を読めること"""
+        segments = [{"start": 0.0, "end": 5.0, "speaker": "SPEAKER_A"}]
+        mock_s3.get_object.return_value = {
+            "Body": MagicMock(read=lambda: gzip.compress(json.dumps(segments).encode())),
+            "ContentEncoding": "gzip",
+        }
+
+        event = {
+            "bucket": "test-bucket",
+            "audio_key": "processed/test.wav",
+            "segments_key": "processed/test_segments.json.gz",
+        }
+        context = MagicMock()
+
+        result = lambda_module.lambda_handler(event, context)
+
+        assert result["segment_count"] == 1
+        assert result["segment_batches"][0][0]["speaker"] == "SPEAKER_A"
+
     def test_lambda_handler_many_segments(
-        self, mock_s3: MagicMock, mock_subprocess: MagicMock, mock_os: None
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_os: None,
     ) -> None:
         """多数のセグメント（900+）でもペイロードが256KB未満であること"""
         # 900セグメント分のモックデータ
@@ -155,34 +181,106 @@ class TestSplitBySpeaker:
 
         result = lambda_module.lambda_handler(event, context)
 
-        # segment_filesが返される（Map state用）
+        # バッチ化した segment_files が返される（Map state用）
         assert result["segment_count"] == 900
-        assert "segment_files" in result
-        assert len(result["segment_files"]) == 900
+        assert sum(len(batch) for batch in result["segment_batches"]) == 900
         # 返却値のサイズが256KB未満であることを確認（約100バイト/セグメント）
         result_json = json.dumps(result)
         assert len(result_json) < 256 * 1024  # 256KB未満
 
-    def test_split_audio_calls_ffmpeg_correctly(
-        self, mock_subprocess: MagicMock, tmp_path: Path
+    def test_lambda_handler_batches_ffmpeg_calls(
+        self,
+        lambda_module: ModuleType,
+        mock_s3: MagicMock,
+        mock_subprocess: MagicMock,
+        mock_os: None,
     ) -> None:
-        """split_audio が ffmpeg を正しく呼び出すこと"""
+        """ffmpeg はセグメントごとではなくバッチごとに1回だけ起動されること"""
+        segments = [
+            {"start": float(i), "end": float(i + 1), "speaker": "SPEAKER_00"}
+            for i in range(lambda_module.MAX_OUTPUTS_PER_FFMPEG + 1)
+        ]
+        mock_s3.get_object.return_value = {
+            "Body": MagicMock(read=lambda: json.dumps(segments).encode())
+        }
+
+        event = {
+            "bucket": "test-bucket",
+            "audio_key": "processed/test.wav",
+            "segments_key": "processed/test_segments.json",
+        }
+
+        result = lambda_module.lambda_handler(event, MagicMock())
+
+        assert mock_subprocess.call_count == 2
+        assert result["segment_batches"][-1][-1]["key"] == (
+            f"segments/test_{lambda_module.MAX_OUTPUTS_PER_FFMPEG:04d}_SPEAKER_00.wav"
+        )
+
+    def test_batch_segment_files_caps_total_seconds(self, lambda_module: ModuleType) -> None:
+        """バッチは件数ではなく合計音声長で区切られること"""
+        max_seconds = lambda_module.TRANSCRIBE_BATCH_MAX_SECONDS
+        segment_files = [
+            {"key": "a", "start": 0.0, "end": max_seconds * 0.6},
+            {"key": "b", "start": 0.0, "end": max_seconds * 0.6},
+            {"key": "c", "start": 0.0, "end": max_seconds * 0.3},
+            {"key": "d", "start": 0.0, "end": max_seconds * 2},
+            {"key": "e", "start": 0.0, "end": 1.0},
+        ]
+
+        batches = lambda_module.batch_segment_files(segment_files)
+
+        # 上限を超える長いセグメントは単独のバッチになる
+        assert [[f["key"] for f in batch] for batch in batches] == [["a"], ["b", "c"], ["d"], ["e"]]
+
+    def test_batch_segment_files_caps_segment_count(self, lambda_module: ModuleType) -> None:
+        """短いセグメントでも1バッチの件数には上限があること"""
+        max_segments = lambda_module.TRANSCRIBE_BATCH_MAX_SEGMENTS
+        segment_files = [{"key": str(i), "start": 0.0, "end": 1.0} for i in range(max_segments + 1)]
+
+        batches = lambda_module.batch_segment_files(segment_files)
+
+        assert [len(batch) for batch in batches] == [max_segments, 1]
+        assert lambda_module.batch_segment_files([]) == []
+
+    def test_split_all_audio_calls_ffmpeg_correctly(
+        self, lambda_module: ModuleType, mock_subprocess: MagicMock, tmp_path: Path
+    ) -> None:
+        """split_all_audio が1回の ffmpeg で全区間を切り出すこと"""
         input_path = str(tmp_path / "input.wav")
-        output_path = str(tmp_path / "output.wav")
+        output_paths = [str(tmp_path / "output_0.wav"), str(tmp_path / "output_1.wav")]
         Path(input_path).touch()
 
-        lambda_module.split_audio(input_path, output_path, 5.0, 10.0)
+        lambda_module.split_all_audio(
+            input_path, [(output_paths[0], 5.0, 10.0), (output_paths[1], 20.0, 3.0)]
+        )
 
-        # subprocess.run が呼び出されたことを確認
+        # subprocess.run が1回だけ呼び出されたことを確認
         mock_subprocess.assert_called_once()
         call_args = mock_subprocess.call_args[0][0]
 
         # ffmpeg コマンドの確認
         assert call_args[0] == "ffmpeg"
-        assert "-ss" in call_args
+        assert call_args.count("-ss") == 2
+        assert call_args.count("-i") == 2
+        assert input_path in call_args
+        # -ss は入力シーク（-i より前）、各出力は 16kHz モノラル PCM に正規化
+        assert call_args.index("-ss") < call_args.index("-i")
+        assert "copy" not in call_args
+        assert call_args.count("pcm_s16le") == 2
+        assert call_args.count("16000") == 2
+        assert call_args.count("-ac") == 2
         assert "5.0" in call_args
-        assert "-t" in call_args
         assert "10.0" in call_args
-        assert "-i" in call_args
-        assert input_path in call_args
-        assert output_path in call_args
+        assert "20.0" in call_args
+        assert "3.0" in call_args
+        assert all(path in call_args for path in output_paths)
+
+    def test_split_all_audio_missing_input(
+        self, lambda_module: ModuleType, tmp_path: Path
+    ) -> None:
+        """入力ファイルがなければ FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            lambda_module.split_all_audio(
+                str(tmp_path / "missing.wav"), [(str(tmp_path / "out.wav"), 0.0, 1.0)]
+            )
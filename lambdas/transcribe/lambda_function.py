@@ -7,12 +7,18 @@ Version: 3.0 - States.DataLimitExceeded対策
 - 結果をS3に保存し、キーのみ返す（ペイロード削減）
 """
 
-import json
+import functools
+import gzip
+import io
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import boto3
+import orjson
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from progress import update_progress
 
@@ -20,13 +26,50 @@ from progress import update_progress
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# S3 クライアント
-s3 = boto3.client("s3")
+
+@functools.cache
+def _s3() -> Any:
+    """
+    S3 クライアントを初回利用時に生成（以降は同じクライアントを再利用）
+
+    インポート時には認証情報やエンドポイントの解決を行わない。
+    ウォーム起動間で GET / PUT の接続を使い回せるよう TCP keepalive を有効にする
+    """
+    # 並列取得のワーカースレッドから初めて呼ばれても安全なよう、既定セッションを共有しない
+    return boto3.session.Session().client(
+        "s3",
+        config=Config(
+            # 並列に走る fetch_audio がそれぞれ範囲 GET を並列に発行し、さらに結果の PUT が加わる
+            max_pool_connections=PREFETCH_WORKERS * MAX_RANGE_WORKERS + 1,
+            tcp_keepalive=True,
+            connect_timeout=2,
+            read_timeout=30,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+
 
 # 環境変数
 WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "medium")
 WHISPER_MODEL_DIR = os.environ.get("WHISPER_MODEL_DIR", "/opt/whisper-models")
 
+# この長さ（秒）未満のセグメントは貪欲デコード（beam_size=1）で十分な精度が出る
+SHORT_SEGMENT_SEC = 8.0
+
+# この大きさ（バイト）を超える結果 JSON は gzip 圧縮して保存する
+GZIP_MIN_BYTES = 2048
+
+# 音声は先頭からこの大きさの範囲 GET で取得し、残りがあれば同じ大きさの範囲 GET を並列に発行する
+RANGE_CHUNK_BYTES = 2 * 1024 * 1024
+MAX_RANGE_WORKERS = 8
+
+# lambda_handler でモデル読み込みと音声の先読みに使うスレッド数
+# （モデル読み込み済みなら 2 スレッドとも fetch_audio を実行する）
+PREFETCH_WORKERS = 2
+
+# CTranslate2 の推論スレッド数（Lambda に割り当てられた vCPU 数に合わせる）
+CPU_THREADS = max(1, os.cpu_count() or 2)
+
 # グローバル変数（コールドスタート対策）
 _model = None
 
@@ -36,6 +79,9 @@ def get_model() -> Any:
     global _model
 
     if _model is None:
+        # OpenMP のスレッド数を CTranslate2 と揃え、少ない vCPU での過剰なスレッド生成を防ぐ
+        # （faster_whisper のインポート前に設定する必要がある）
+        os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
         from faster_whisper import WhisperModel
 
         logger.info(f"Loading Whisper model: {WHISPER_MODEL} from {WHISPER_MODEL_DIR}")
@@ -43,6 +89,8 @@ def get_model() -> Any:
             WHISPER_MODEL,
             device="cpu",
             compute_type="int8",
+            cpu_threads=CPU_THREADS,
+            num_workers=1,  # バッチ内のセグメントは順に文字起こしするため並列ワーカーは不要
             download_root=WHISPER_MODEL_DIR,
         )
         logger.info("Model loaded from pre-downloaded cache")
@@ -50,6 +98,145 @@ def get_model() -> Any:
     return _model
 
 
+def warm_up_model() -> None:
+    """
+    モデルを読み込み、短い無音で1回推論して重みやトークナイザーをメモリに載せる
+
+    初回推論時のページフォールトや遅延初期化をハンドラー外（初期化フェーズ）で済ませる
+    """
+    import numpy as np
+
+    model = get_model()
+    try:
+        # 16kHz で 0.1 秒の無音。セグメントはジェネレーターなので消費して推論を走らせる
+        segments, _ = model.transcribe(
+            np.zeros(1600, dtype=np.float32), beam_size=1, language="ja"
+        )
+        for _ in segments:
+            pass
+        logger.info("Model warmed up")
+    except Exception as e:
+        logger.warning(f"Model warm-up failed: {e}")
+
+
+def fetch_audio(bucket: str, key: str) -> io.BytesIO:
+    """
+    S3 から音声セグメントをメモリに読み込む（/tmp への書き出しと再読み込みを省く）
+
+    大きなセグメントは範囲 GET を並列に発行して取得する。
+    先頭の範囲 GET で全体サイズも分かるため、小さなセグメントは従来どおり GET 1回で済む
+
+    Args:
+        bucket: S3 バケット名
+        key: 音声セグメントの S3 キー
+
+    Returns:
+        音声データ
+    """
+
+    def fetch_range(first: int, last: int) -> tuple[bytes, int]:
+        response = _s3().get_object(Bucket=bucket, Key=key, Range=f"bytes={first}-{last}")
+        total_size = int(response["ContentRange"].rsplit("/", 1)[1])
+        return response["Body"].read(), total_size
+
+    try:
+        head, total_size = fetch_range(0, RANGE_CHUNK_BYTES - 1)
+    except ClientError as e:
+        # 0 バイトのオブジェクトに範囲 GET すると InvalidRange になるため通常の GET で取得する
+        if e.response.get("Error", {}).get("Code") != "InvalidRange":
+            raise
+        response = _s3().get_object(Bucket=bucket, Key=key)
+        return io.BytesIO(response["Body"].read())
+    audio = io.BytesIO(head)
+    if total_size <= len(head):
+        return audio
+
+    ranges = [
+        (first, min(first + RANGE_CHUNK_BYTES, total_size) - 1)
+        for first in range(len(head), total_size, RANGE_CHUNK_BYTES)
+    ]
+    audio.seek(0, io.SEEK_END)
+    with ThreadPoolExecutor(max_workers=min(MAX_RANGE_WORKERS, len(ranges))) as executor:
+        for part, _ in executor.map(lambda r: fetch_range(*r), ranges):
+            audio.write(part)
+    audio.seek(0)
+    return audio
+
+
+def transcribe_segment(
+    model: Any, bucket: str, segment_file: dict[str, Any], audio: io.BytesIO
+) -> dict[str, Any]:
+    """
+    1セグメントを文字起こしし、結果を S3 に保存
+
+    Args:
+        model: Whisper モデル
+        bucket: S3 バケット名
+        segment_file: セグメントファイル情報（key, speaker, start, end）
+        audio: セグメントの音声データ
+
+    Returns:
+        result_key, speaker, start, end
+    """
+    segment_key = segment_file["key"]
+    speaker = segment_file["speaker"]
+    start = segment_file["start"]
+    end = segment_file["end"]
+
+    # 文字起こし実行
+    logger.info(f"Transcribing s3://{bucket}/{segment_key}")
+    # ビーム探索のコストはビーム幅に比例するため、話者分割済みの短いセグメントは幅1にする
+    beam_size = 1 if end - start < SHORT_SEGMENT_SEC else 5
+    segments, info = model.transcribe(
+        audio,
+        beam_size=beam_size,
+        language="ja",
+        vad_filter=True,
+        vad_parameters={"min_silence_duration_ms": 500},
+        condition_on_previous_text=False,
+        without_timestamps=True,
+    )
+
+    # テキストを結合
+    text = "".join(seg.text for seg in segments)
+    logger.info(f"Transcription: {text[:100]}...")
+
+    # 結果をS3に保存（States.DataLimitExceeded対策）
+    # セグメントキーから結果キーを生成
+    segment_name = segment_key.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    result_key = f"transcribe_results/{segment_name}.json"
+
+    result_data = {
+        "speaker": speaker,
+        "start": start,
+        "end": end,
+        "text": text,
+    }
+
+    # UTF-8 のまま出力（日本語をエスケープしない）。長い文字起こしのみ圧縮する
+    body = orjson.dumps(result_data)
+    encoding_args = {}
+    if len(body) > GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=1)
+        encoding_args["ContentEncoding"] = "gzip"
+
+    logger.info(f"Saving result to s3://{bucket}/{result_key}")
+    _s3().put_object(
+        Bucket=bucket,
+        Key=result_key,
+        Body=body,
+        ContentType="application/json",
+        **encoding_args,
+    )
+
+    return {
+        "result_key": result_key,
+        "speaker": speaker,
+        "start": start,
+        "end": end,
+    }
+
+
 def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """
     Lambda ハンドラー
@@ -57,7 +244,8 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     Args:
         event: Lambda イベント
             - bucket: S3 バケット名
-            - segment_file: セグメントファイル情報
+            - segment_files: セグメントファイル情報のリスト（Map state でバッチ化）
+            - segment_file: 単一のセグメントファイル情報（segment_files がない場合）
                 - key: S3 キー
                 - speaker: 話者ID
                 - start: 開始時刻
@@ -67,10 +255,8 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     Returns:
         処理結果（ペイロード削減のためメタデータのみ）
             - bucket: S3 バケット名
-            - result_key: 結果ファイルのS3キー
-            - speaker: 話者ID
-            - start: 開始時刻
-            - end: 終了時刻
+            - results: セグメントごとの result_key, speaker, start, end
+              （segment_file 指定時は results ではなくそのセグメントの値を直接返す）
         ※ textはS3に保存（States.DataLimitExceeded対策）
     """
     logger.info(f"Event: {event}")
@@ -81,67 +267,38 @@ def lambda_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
         update_progress(interview_id, "transcribing")
 
     bucket = event["bucket"]
-    segment_file = event["segment_file"]
-
-    segment_key = segment_file["key"]
-    speaker = segment_file["speaker"]
-    start = segment_file["start"]
-    end = segment_file["end"]
+    batched = "segment_files" in event
+    segment_files = event["segment_files"] if batched else [event["segment_file"]]
 
-    local_path = "/tmp/segment.wav"
+    # モデル読み込み（コールドスタート時）の間に音声を先読みし、
+    # 以降も文字起こし中に次のセグメントの取得を進める
+    logger.info(f"Transcribing {len(segment_files)} segments")
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        model_future = executor.submit(get_model)
+        audio_futures = [
+            executor.submit(fetch_audio, bucket, segment_file["key"])
+            for segment_file in segment_files
+        ]
+        model = model_future.result()
+        results = [
+            transcribe_segment(model, bucket, segment_file, audio_future.result())
+            for segment_file, audio_future in zip(segment_files, audio_futures, strict=True)
+        ]
 
-    try:
-        # S3 から音声セグメントをダウンロード
-        logger.info(f"Downloading s3://{bucket}/{segment_key}")
-        s3.download_file(bucket, segment_key, local_path)
-
-        # 文字起こし実行
-        logger.info("Transcribing audio...")
-        model = get_model()
-        segments, info = model.transcribe(
-            local_path,
-            beam_size=5,
-            language="ja",
-        )
+    # Step Functionsにはメタデータとキーのみ返す（ペイロード削減）
+    result: dict[str, Any] = {"bucket": bucket}
+    if batched:
+        result["results"] = results
+    else:
+        result.update(results[0])
+    # interview_id を次のステップに渡す
+    if interview_id:
+        result["interview_id"] = interview_id
+    return result
 
-        # テキストを結合
-        text = "".join([seg.text for seg in segments])
-        logger.info(f"Transcription: {text[:100]}...")
-
-        # 結果をS3に保存（States.DataLimitExceeded対策）
-        # セグメントキーから結果キーを生成
-        segment_name = segment_key.rsplit("/", 1)[-1].rsplit(".", 1)[0]
-        result_key = f"transcribe_results/{segment_name}.json"
-
-        result_data = {
-            "speaker": speaker,
-            "start": start,
-            "end": end,
-            "text": text,
-        }
-
-        logger.info(f"Saving result to s3://{bucket}/{result_key}")
-        s3.put_object(
-            Bucket=bucket,
-            Key=result_key,
-            Body=json.dumps(result_data, ensure_ascii=False),
-            ContentType="application/json",
-        )
 
-        # Step Functionsにはメタデータとキーのみ返す（ペイロード削減）
-        result = {
-            "bucket": bucket,
-            "result_key": result_key,
-            "speaker": speaker,
-            "start": start,
-            "end": end,
-        }
-        # interview_id を次のステップに渡す
-        if interview_id:
-            result["interview_id"] = interview_id
-        return result
-
-    finally:
-        # 一時ファイルをクリーンアップ
-        if os.path.exists(local_path):
-            os.remove(local_path)
+# Provisioned Concurrency の初期化フェーズでウォームアップ
+# （オンデマンドの初期化は 10 秒の制限があり、モデル読み込みと推論で超えると
+#   呼び出し時に初期化がやり直されるため実行しない。テストやローカル実行でも実行しない）
+if os.environ.get("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency":
+    warm_up_model()
@@ -7,7 +7,9 @@ Transcribe Lambda のテスト
 - 結果をS3に保存し、キーのみ返す
 """
 
+import gzip
 import importlib.util
+import io
 import json
 import sys
 from collections.abc import Generator
@@ -15,6 +17,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from botocore.exceptions import ClientError
 
 # このLambdaのlambda_function.pyを動的にインポート
 LAMBDA_DIR = Path(__file__).parent.parent
@@ -27,13 +30,138 @@ if spec and spec.loader:
     spec.loader.exec_module(lambda_module)
 
 
+class TestGetModel:
+    """モデル読み込みのテスト"""
+
+    def test_model_uses_cpu_threads(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """int8 で vCPU 数に合わせたスレッド数を指定して読み込むこと"""
+        whisper_model = MagicMock()
+        monkeypatch.setitem(
+            sys.modules, "faster_whisper", MagicMock(WhisperModel=whisper_model)
+        )
+        monkeypatch.setattr(lambda_module, "_model", None)
+        monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+
+        lambda_module.get_model()
+
+        kwargs = whisper_model.call_args.kwargs
+        assert kwargs["compute_type"] == "int8"
+        assert kwargs["cpu_threads"] == lambda_module.CPU_THREADS
+        assert kwargs["num_workers"] == 1
+        assert lambda_module.os.environ["OMP_NUM_THREADS"] == str(lambda_module.CPU_THREADS)
+
+
+class TestFetchAudio:
+    """音声取得のテスト"""
+
+    def test_large_object_fetched_by_ranges(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """先頭チャンクを超える音声は範囲 GET を組み合わせて元のバイト列を復元すること"""
+        data = bytes(range(256)) * 4
+        monkeypatch.setattr(lambda_module, "RANGE_CHUNK_BYTES", 300)
+
+        def get_object(Bucket: str, Key: str, Range: str) -> dict:
+            first, last = (int(v) for v in Range.removeprefix("bytes=").split("-"))
+            last = min(last, len(data) - 1)
+            return {
+                "Body": io.BytesIO(data[first : last + 1]),
+                "ContentRange": f"bytes {first}-{last}/{len(data)}",
+            }
+
+        mock_s3 = MagicMock()
+        mock_s3.get_object.side_effect = get_object
+        with patch.object(lambda_module, "_s3", return_value=mock_s3):
+            audio = lambda_module.fetch_audio("test-bucket", "segments/long.wav")
+
+        assert audio.read() == data
+        assert mock_s3.get_object.call_count == 4  # 1024 バイト / 300 バイト
+
+    def test_connection_pool_covers_concurrent_gets(self) -> None:
+        """並列の範囲 GET と結果の PUT が同時に走っても接続プールが不足しないこと"""
+        lambda_module._s3.cache_clear()
+        try:
+            pool_size = lambda_module._s3().meta.config.max_pool_connections
+        finally:
+            lambda_module._s3.cache_clear()
+
+        assert pool_size > lambda_module.PREFETCH_WORKERS * lambda_module.MAX_RANGE_WORKERS
+
+    def test_small_object_single_get(self) -> None:
+        """先頭チャンクに収まる音声は GET 1回で取得すること"""
+        mock_s3 = MagicMock()
+        mock_s3.get_object.return_value = {
+            "Body": io.BytesIO(b"RIFF"),
+            "ContentRange": "bytes 0-3/4",
+        }
+        with patch.object(lambda_module, "_s3", return_value=mock_s3):
+            audio = lambda_module.fetch_audio("test-bucket", "segments/short.wav")
+
+        assert audio.read() == b"RIFF"
+        mock_s3.get_object.assert_called_once()
+
+    def test_empty_object_falls_back_to_plain_get(self) -> None:
+        """0 バイトの音声で範囲 GET が InvalidRange になっても通常の GET で取得すること"""
+        mock_s3 = MagicMock()
+        mock_s3.get_object.side_effect = [
+            ClientError({"Error": {"Code": "InvalidRange", "Message": "Range"}}, "GetObject"),
+            {"Body": io.BytesIO(b"")},
+        ]
+        with patch.object(lambda_module, "_s3", return_value=mock_s3):
+            audio = lambda_module.fetch_audio("test-bucket", "segments/empty.wav")
+
+        assert audio.read() == b""
+        assert mock_s3.get_object.call_count == 2
+        assert "Range" not in mock_s3.get_object.call_args.kwargs
+
+    def test_other_client_errors_are_raised(self) -> None:
+        """InvalidRange 以外のエラーはそのまま送出すること"""
+        mock_s3 = MagicMock()
+        mock_s3.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "GetObject"
+        )
+        with patch.object(lambda_module, "_s3", return_value=mock_s3):
+            with pytest.raises(ClientError):
+                lambda_module.fetch_audio("test-bucket", "segments/missing.wav")
+
+
+class TestWarmUpModel:
+    """初期化時ウォームアップのテスト"""
+
+    def test_runs_short_greedy_inference(self) -> None:
+        """無音に対して beam_size=1 で推論し、結果を最後まで消費すること"""
+        model = MagicMock()
+        consumed = []
+        model.transcribe.return_value = ((consumed.append(i) for i in range(2)), MagicMock())
+
+        with patch.object(lambda_module, "get_model", return_value=model):
+            lambda_module.warm_up_model()
+
+        audio = model.transcribe.call_args.args[0]
+        assert audio.dtype.name == "float32"
+        assert model.transcribe.call_args.kwargs["beam_size"] == 1
+        assert consumed == [0, 1]
+
+    def test_failure_does_not_raise(self) -> None:
+        """ウォームアップの失敗は初期化を止めないこと"""
+        model = MagicMock()
+        model.transcribe.side_effect = RuntimeError("boom")
+
+        with patch.object(lambda_module, "get_model", return_value=model):
+            lambda_module.warm_up_model()
+
+
 class TestTranscribe:
     """文字起こし機能のテスト"""
 
     @pytest.fixture
     def mock_s3(self) -> Generator[MagicMock, None, None]:
         """S3 クライアントのモック"""
-        with patch.object(lambda_module, "s3") as mock:
+        mock = MagicMock()
+        # 呼び出しごとに新しい Body を返す（バッチでは複数回 GET される）
+        mock.get_object.side_effect = lambda **_: {
+            "Body": io.BytesIO(b"RIFF"),
+            "ContentRange": "bytes 0-3/4",
+        }
+        with patch.object(lambda_module, "_s3", return_value=mock):
             yield mock
 
     @pytest.fixture
@@ -65,6 +193,12 @@ class TestTranscribe:
 
         result = lambda_module.lambda_handler(event, context)
 
+        # 音声はファイルを経由せずメモリ上のバイト列として渡されること
+        mock_s3.get_object.assert_called_once()
+        assert mock_s3.get_object.call_args.kwargs["Key"] == "segments/test_0000_SPEAKER_00.wav"
+        audio = mock_whisper.return_value.transcribe.call_args.args[0]
+        assert audio.getvalue() == b"RIFF"
+
         # S3に結果が保存されること
         mock_s3.put_object.assert_called_once()
         call_args = mock_s3.put_object.call_args
@@ -72,6 +206,7 @@ class TestTranscribe:
         assert "transcribe_results/" in call_args.kwargs["Key"]
 
         # 保存されたJSONの内容を検証
+        assert "ContentEncoding" not in call_args.kwargs  # 短い結果は非圧縮
         saved_data = json.loads(call_args.kwargs["Body"])
         assert saved_data["speaker"] == "SPEAKER_00"
         assert saved_data["text"] == "これはテストの文字起こしです。"
@@ -107,6 +242,73 @@ class TestTranscribe:
         # textはS3に保存されるため、返却値には含まれない
         assert "text" not in result
 
+    @pytest.mark.parametrize(("end", "beam_size"), [(105.0, 1), (110.0, 5)])
+    def test_beam_size_by_duration(
+        self, mock_s3: MagicMock, mock_whisper: MagicMock, end: float, beam_size: int
+    ) -> None:
+        """短いセグメントは貪欲デコード、長いセグメントはビーム探索"""
+        event = {
+            "bucket": "test-bucket",
+            "segment_file": {
+                "key": "segments/audio_0042_SPEAKER_01.wav",
+                "speaker": "SPEAKER_01",
+                "start": 100.0,
+                "end": end,
+            },
+        }
+
+        lambda_module.lambda_handler(event, MagicMock())
+
+        kwargs = mock_whisper.return_value.transcribe.call_args.kwargs
+        assert kwargs["beam_size"] == beam_size
+        assert kwargs["vad_filter"] is True
+
+    def test_long_result_is_gzipped(self, mock_s3: MagicMock, mock_whisper: MagicMock) -> None:
+        """大きな結果 JSON は gzip 圧縮して保存されること"""
+        segment = MagicMock()
+        segment.text = "あ" * 1000
+        mock_whisper.return_value.transcribe.return_value = ([segment], MagicMock())
+        event = {
+            "bucket": "test-bucket",
+            "segment_file": {
+                "key": "segments/test_0000_SPEAKER_00.wav",
+                "speaker": "SPEAKER_00",
+                "start": 0.0,
+                "end": 30.0,
+            },
+        }
+
+        lambda_module.lambda_handler(event, MagicMock())
+
+        call_kwargs = mock_s3.put_object.call_args.kwargs
+        assert call_kwargs["ContentEncoding"] == "gzip"
+        assert json.loads(gzip.decompress(call_kwargs["Body"]))["text"] == "あ" * 1000
+
+    def test_lambda_handler_batch(self, mock_s3: MagicMock, mock_whisper: MagicMock) -> None:
+        """segment_files のバッチをモデル1回の取得で順に処理すること"""
+        event = {
+            "bucket": "test-bucket",
+            "segment_files": [
+                {
+                    "key": f"segments/test_{i:04d}_SPEAKER_00.wav",
+                    "speaker": "SPEAKER_00",
+                    "start": float(i * 10),
+                    "end": float(i * 10 + 5),
+                }
+                for i in range(3)
+            ],
+        }
+
+        result = lambda_module.lambda_handler(event, MagicMock())
+
+        mock_whisper.assert_called_once()
+        assert mock_s3.get_object.call_count == 3
+        assert mock_s3.put_object.call_count == 3
+        assert [r["result_key"] for r in result["results"]] == [
+            f"transcribe_results/test_{i:04d}_SPEAKER_00.json" for i in range(3)
+        ]
+        assert [r["start"] for r in result["results"]] == [0.0, 10.0, 20.0]
+
     def test_result_key_format(
         self, mock_s3: MagicMock, mock_whisper: MagicMock
     ) -> None: